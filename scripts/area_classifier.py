@@ -0,0 +1,93 @@
+import os
+import threading
+
+import numpy as np
+
+import instrumentation
+from embeddings import get_embeddings
+from llm_executor import map_concurrently
+
+# How research areas are assigned: "llm" (one chat completion per professor) or "embedding"
+# (cosine similarity against embedded area labels, with the LLM only for close calls).
+CLASSIFIER_MODE = os.getenv("AREA_CLASSIFIER", "llm")
+
+# If the best area beats the runner-up by less than this cosine margin, ask the LLM instead.
+MIN_MARGIN = float(os.getenv("AREA_CLASSIFIER_MIN_MARGIN", 0.02))
+# Same cut-off the LLM classifiers use: shorter descriptions are "Not found".
+MIN_WORDS = 10
+
+
+def use_embeddings() -> bool:
+    return CLASSIFIER_MODE == "embedding"
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class AreaClassifier:
+    """
+    Nearest-label classifier over a fixed list of research areas. Area labels (optionally
+    with a short description each) are embedded once; a batch of texts is then classified
+    with a single matrix multiply against the label matrix.
+    """
+
+    def __init__(self, areas: list, descriptions: dict = None, min_margin: float = MIN_MARGIN):
+        self.areas = list(areas)
+        self.min_margin = min_margin
+        descriptions = descriptions or {}
+        labels = [f"Academic research in {area}. {descriptions.get(area, '')}".strip() for area in self.areas]
+        vectors = get_embeddings(labels)
+        if any(not vector for vector in vectors):
+            raise RuntimeError("Could not embed every research area label.")
+        self.label_matrix = _normalize(np.asarray(vectors, dtype=np.float32))
+
+    def scores(self, embeddings: list) -> np.ndarray:
+        """Cosine similarity of each embedding (rows) against each area (columns)."""
+        return _normalize(np.asarray(embeddings, dtype=np.float32)) @ self.label_matrix.T
+
+    @instrumentation.instrumented("classify")
+    def classify_many(self, texts: list, fallback=None) -> list:
+        """
+        Return one area per text. Texts under MIN_WORDS words are "Not found". When the top
+        two areas are within min_margin of each other (or the text could not be embedded),
+        fallback(text) decides if given, otherwise the top area is kept.
+        """
+        texts = list(texts)
+        areas = ["Not found"] * len(texts)
+        todo = [i for i, text in enumerate(texts) if text and len(text.split()) >= MIN_WORDS]
+        embeddings = get_embeddings([texts[i] for i in todo])
+        embedded = [(i, vector) for i, vector in zip(todo, embeddings) if vector]
+        unsure = [i for i, vector in zip(todo, embeddings) if not vector]
+
+        if embedded:
+            scores = self.scores([vector for _, vector in embedded])
+            top_two = np.argsort(scores, axis=1)[:, -2:]
+            rows = np.arange(len(embedded))
+            best = scores[rows, top_two[:, -1]]
+            margins = best - scores[rows, top_two[:, 0]] if len(self.areas) > 1 else best
+            for row, (i, _) in enumerate(embedded):
+                areas[i] = self.areas[top_two[row, -1]]
+                if margins[row] < self.min_margin:
+                    unsure.append(i)
+
+        if fallback and unsure:
+            print(f"Area classifier: {len(unsure)} of {len(todo)} professor(s) too close to call; asking the LLM.")
+            for i, area in zip(unsure, map_concurrently(fallback, [texts[i] for i in unsure])):
+                areas[i] = area
+        return areas
+
+
+_classifiers = {}
+_classifiers_lock = threading.Lock()
+
+
+def get_classifier(areas: list) -> AreaClassifier:
+    """Shared classifier per area list, so the labels are embedded once per process."""
+    key = tuple(areas)
+    with _classifiers_lock:
+        if key not in _classifiers:
+            _classifiers[key] = AreaClassifier(areas)
+        return _classifiers[key]
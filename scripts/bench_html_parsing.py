@@ -0,0 +1,168 @@
+"""
+Benchmark: parse + extract per faculty page, old ("html.parser" and one tree search per
+field) vs new (html_parsing backend and the single-walk extract_details_from_page), on the
+pages stored in the HTTP cache (run a scraper first to populate it). With the same parser
+both extractors must return identical details; that is checked too.
+
+    python bench_html_parsing.py [--repeat N] [--limit PAGES]
+"""
+import argparse
+import glob
+import os
+import re
+import time
+
+from bs4 import BeautifulSoup
+
+from http_cache import CACHE_DIR
+from html_parsing import LXML_AVAILABLE, PARSER, parse_html
+from scrape_cs_professors import (
+    KNOWN_PREFERRED_MAJORS, KNOWN_RESEARCH_AREAS, clean_list, clean_text, extract_details_from_page,
+    simple_match_keywords,
+)
+
+
+def legacy_extract_details(soup):
+    """The CS extractor before the single-walk rewrite: one tree search per field."""
+    details = {}
+    full_text = clean_text(soup.get_text(separator=" ", strip=True))
+    
+    # Name
+    header = soup.find(['h1', 'h2'])
+    details["name"] = clean_text(header.get_text()) if header else "N/A"
+    
+    # Email
+    emails = soup.find_all(string=re.compile(r'[\w\.-]+@[\w\.-]+'))
+    details["email"] = clean_text(emails[0]) if emails else "N/A"
+    
+    # Department
+    dept = "N/A"
+    dept_tag = soup.find(string=re.compile(r'Department:', re.IGNORECASE))
+    if dept_tag:
+        parts = dept_tag.split("Department:")
+        if len(parts) > 1:
+            dept = clean_text(parts[1])
+    else:
+        if "cs.purdue.edu" in soup.base_url.lower():
+            dept = "Computer Science"
+    # currently hard coding computer science 
+    # details["department"] = dept
+    details["department"] = "Computer Science"
+    
+    # Classes Teaching
+    classes = []
+    classes_tag = soup.find(string=re.compile(r'(Courses|Classes|Teaching):', re.IGNORECASE))
+    if classes_tag:
+        parent = classes_tag.parent
+        text = re.sub(r'(Courses|Classes|Teaching):', '', parent.get_text(separator=" ", strip=True), flags=re.IGNORECASE)
+        classes = [clean_text(c) for c in re.split(r'[;,]', text) if c.strip()]
+    if not classes:
+        course_matches = re.findall(r'CS\s*\d{3,5}', full_text)
+        classes = list(set(course_matches))
+    details["classes_teaching"] = clean_list(classes)
+    
+    # Research Areas
+    research_areas = []
+    research_tag = soup.find(string=re.compile(r'(Research Interests|Research Areas):', re.IGNORECASE))
+    if research_tag:
+        parent = research_tag.parent
+        text = re.sub(r'(Research Interests|Research Areas):', '', parent.get_text(separator=" ", strip=True), flags=re.IGNORECASE)
+        research_areas = [clean_text(r) for r in re.split(r'[;,]', text) if r.strip()]
+    if not research_areas:
+        research_areas = simple_match_keywords(full_text, KNOWN_RESEARCH_AREAS)
+    details["research_areas"] = clean_list(research_areas)
+    
+    # Preferred Majors
+    preferred_majors = []
+    majors_tag = soup.find(string=re.compile(r'Preferred Majors:', re.IGNORECASE))
+    if majors_tag:
+        parent = majors_tag.parent
+        text = re.sub(r'Preferred Majors:', '', parent.get_text(separator=" ", strip=True), flags=re.IGNORECASE)
+        preferred_majors = [clean_text(m) for m in re.split(r'[;,]', text) if m.strip()]
+    if not preferred_majors:
+        preferred_majors = simple_match_keywords(full_text, KNOWN_PREFERRED_MAJORS)
+    details["preferred_majors"] = clean_list(preferred_majors)
+    
+    # Research Description – explicit extraction; fallback to paragraphs mentioning "research"
+    research_desc = ""
+    research_desc_tag = soup.find(string=re.compile(r'(Publications|Past Papers|Research Description):', re.IGNORECASE))
+    if research_desc_tag:
+        parent = research_desc_tag.parent
+        research_desc = re.sub(r'(Publications|Past Papers|Research Description):', '', parent.get_text(separator=" ", strip=True), flags=re.IGNORECASE)
+    if not research_desc:
+        paragraphs = soup.find_all("p")
+        candidate_texts = [clean_text(p.get_text(separator=" ", strip=True)) for p in paragraphs if ("research" in p.get_text().lower() or "interest" in p.get_text().lower() or "publication" in p.get_text().lower())]
+        if candidate_texts:
+            research_desc = " ".join(candidate_texts[:3])
+    details["research_description"] = clean_text(research_desc)
+    
+    # Academic Background – similar extraction
+    academic_bg = ""
+    edu_tag = soup.find(string=re.compile(r'(Education|Academic Background):', re.IGNORECASE))
+    if edu_tag:
+        parent = edu_tag.parent
+        academic_bg = re.sub(r'(Education|Academic Background):', '', parent.get_text(separator=" ", strip=True), flags=re.IGNORECASE)
+    details["academic_background"] = clean_text(academic_bg)
+    
+    # Currently Looking For
+    looking_for = ""
+    looking_tag = soup.find(string=re.compile(r'(seeking|looking for|accepting)\s+(undergraduate|grad|postgrad|researchers)', re.IGNORECASE))
+    if looking_tag:
+        looking_for = clean_text(looking_tag)
+    details["currently_looking_for"] = looking_for if looking_for else "Not specified"
+    
+    return details
+
+
+def time_pages(pages, parse, extract, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for url, html in pages:
+            extract(parse(html, url))
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def legacy_parse(html, url):
+    soup = BeautifulSoup(html, "html.parser")
+    soup.base_url = url
+    return soup
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTML parsing and detail extraction on cached pages")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing runs per implementation (best is reported)")
+    parser.add_argument("--limit", type=int, default=None, help="Use at most this many cached pages")
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(CACHE_DIR, "bodies", "*.html")))[:args.limit]
+    if not paths:
+        print(f"No cached pages in {CACHE_DIR}; run a scraper first.")
+        return
+    pages = []
+    for path in paths:
+        with open(path, "rb") as f:
+            pages.append(("https://www.cs.purdue.edu/", f.read().decode("utf-8", errors="replace")))
+
+    mismatches = sum(legacy_extract_details(legacy_parse(html, url)) != extract_details_from_page(legacy_parse(html, url))
+                     for url, html in pages)
+    print(f"{len(pages)} cached pages; {mismatches} with different details (both on html.parser).")
+
+    timings = {
+        "html.parser, per-field searches": time_pages(pages, legacy_parse, legacy_extract_details, args.repeat),
+        "html.parser, single walk": time_pages(pages, legacy_parse, extract_details_from_page, args.repeat),
+    }
+    if PARSER != "html.parser":
+        timings[f"{PARSER}, single walk"] = time_pages(pages, parse_html, extract_details_from_page, args.repeat)
+    elif LXML_AVAILABLE:
+        print("HTML_PARSER is set to html.parser; unset it to time the lxml backend.")
+    else:
+        print("lxml is not installed; install it to time the faster backend.")
+    baseline = next(iter(timings.values()))
+    for label, seconds in timings.items():
+        print(f"{label:34} {seconds / len(pages) * 1000:8.2f} ms/page  ({baseline / seconds:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
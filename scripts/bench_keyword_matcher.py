@@ -0,0 +1,96 @@
+"""
+Micro-benchmark: KeywordMatcher vs the old per-keyword substring scan, on the
+faculty pages stored in the HTTP cache (run a scraper first to populate it).
+
+    python bench_keyword_matcher.py [--repeat N] [--limit PAGES]
+"""
+import argparse
+import glob
+import os
+import re
+import time
+
+from bs4 import BeautifulSoup
+
+from http_cache import CACHE_DIR
+from keyword_matcher import KeywordMatcher
+from scrape_cs_professors import KNOWN_PREFERRED_MAJORS, KNOWN_RESEARCH_AREAS
+from scrape_biology_professors import KNOWN_RESEARCH_AREAS_BIO
+
+
+def substring_match_keywords(text, keywords):
+    """The previous simple_match_keywords: one lowercase substring scan per keyword."""
+    text_lower = text.lower()
+    return list(set(kw for kw in keywords if kw.lower() in text_lower))
+
+
+def alternation_matcher(keywords):
+    """Single-pass alternative: one compiled alternation regex with word boundaries."""
+    alternation = "|".join(re.escape(kw) for kw in sorted(keywords, key=len, reverse=True))
+    pattern = re.compile(rf"(?<!\w)(?:{alternation})(?!\w)", re.IGNORECASE)
+    canonical = {kw.lower(): kw for kw in keywords}
+    return lambda text: list({canonical[m.group().lower()] for m in pattern.finditer(text)})
+
+
+def load_cached_page_texts(limit=None):
+    paths = sorted(glob.glob(os.path.join(CACHE_DIR, "bodies", "*.html")))[:limit]
+    texts = []
+    for path in paths:
+        with open(path, "rb") as f:
+            html = f.read().decode("utf-8", errors="replace")
+        texts.append(BeautifulSoup(html, "html.parser").get_text(separator=" ", strip=True))
+    return texts
+
+
+def time_matcher(fn, texts, keyword_lists, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            for keywords in keyword_lists:
+                fn(text, keywords)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark keyword matching on cached pages")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing runs per matcher (best is reported)")
+    parser.add_argument("--limit", type=int, default=None, help="Use at most this many cached pages")
+    args = parser.parse_args()
+
+    texts = load_cached_page_texts(args.limit)
+    if not texts:
+        print(f"No cached pages in {CACHE_DIR}; run a scraper first.")
+        return
+    keyword_lists = [KNOWN_RESEARCH_AREAS, KNOWN_PREFERRED_MAJORS, KNOWN_RESEARCH_AREAS_BIO]
+    matchers = {tuple(keywords): KeywordMatcher(keywords) for keywords in keyword_lists}
+    alternations = {tuple(keywords): alternation_matcher(keywords) for keywords in keyword_lists}
+
+    def whole_word(text, keywords):
+        return matchers[tuple(keywords)].find_all(text)
+
+    def alternation(text, keywords):
+        return alternations[tuple(keywords)](text)
+
+    total_chars = sum(len(text) for text in texts)
+    print(f"{len(texts)} cached pages, {total_chars / 1e6:.1f}M characters, "
+          f"{sum(len(k) for k in keyword_lists)} keywords in {len(keyword_lists)} lists.")
+
+    old = time_matcher(substring_match_keywords, texts, keyword_lists, args.repeat)
+    new = time_matcher(whole_word, texts, keyword_lists, args.repeat)
+    regex = time_matcher(alternation, texts, keyword_lists, args.repeat)
+    print(f"substring scan:    {old * 1000:8.1f} ms")
+    print(f"KeywordMatcher:    {new * 1000:8.1f} ms  ({old / new:.1f}x)")
+    print(f"alternation regex: {regex * 1000:8.1f} ms  ({old / regex:.1f}x)")
+
+    # Hits the substring scan reports that are not whole words (e.g. "Graphics" inside "Infographics").
+    dropped = 0
+    for text in texts:
+        for keywords in keyword_lists:
+            dropped += len(set(substring_match_keywords(text, keywords)) - set(whole_word(text, keywords)))
+    print(f"Substring-only (non whole-word) matches removed: {dropped}")
+
+
+if __name__ == "__main__":
+    main()
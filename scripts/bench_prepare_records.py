@@ -0,0 +1,53 @@
+"""
+Benchmark: prepare_records (column at a time) vs the previous iterrows + prepare_record
+loop, on the combined professors dataset replicated up to --rows rows. Both are also
+checked to produce the same records (apart from rows without a research description,
+which prepare_records now drops up front).
+
+    python bench_prepare_records.py [--rows N] [--repeat N] [--input PATH]
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from dataset_io import dataset_path, read_dataset
+from supabase_upload import prepare_record, prepare_records
+
+
+def legacy_prepare_records(df):
+    return [prepare_record(row.to_dict()) for index, row in df.iterrows()]
+
+
+def best_time(fn, df, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(df)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark upload record preparation")
+    parser.add_argument("--input", default=dataset_path("professors_dataset"), help="Combined dataset (.parquet or .csv)")
+    parser.add_argument("--rows", type=int, default=20000, help="Replicate the dataset up to this many rows")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing runs per implementation (best is reported)")
+    args = parser.parse_args()
+
+    base = read_dataset(args.input)
+    df = pd.concat([base] * max(1, -(-args.rows // len(base))), ignore_index=True).head(args.rows)
+
+    expected = [r for r in legacy_prepare_records(df) if str(r.get("research_description") or "").strip()]
+    mismatches = sum(a != b for a, b in zip(expected, prepare_records(df))) + abs(len(expected) - len(prepare_records(df)))
+
+    before = best_time(legacy_prepare_records, df, args.repeat)
+    after = best_time(prepare_records, df, args.repeat)
+    print(f"{len(df)} rows from {args.input}")
+    print(f"iterrows + prepare_record: {before * 1000:9.1f} ms")
+    print(f"prepare_records:           {after * 1000:9.1f} ms  ({before / after:.1f}x)")
+    print(f"{mismatches} record(s) differ")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Measure what reduced-precision embeddings save and what they cost in retrieval quality:
+for each precision, the bytes per vector in memory and in a saved index, the upload
+payload per vector, and recall@k / top-1 agreement of exact search over the round-tripped
+vectors against float32 (queries stay float32, as they come from the embeddings API).
+
+By default it uses the combined professors dataset (embeddings come from the embedding
+cache); --synthetic N uses N clustered unit vectors instead.
+
+    python bench_quantization.py [--synthetic N] [--queries Q] [--k K]
+"""
+import argparse
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from bench_vector_index import make_queries, synthetic_vectors
+from quantization import PRECISIONS, bytes_per_vector, format_for_upload, round_trip
+from vector_index import VectorIndex, load_professor_vectors, save_vectors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure embedding quantization size and ranking loss")
+    parser.add_argument("--synthetic", type=int, default=None, help="Use this many synthetic vectors instead of the dataset")
+    parser.add_argument("--queries", type=int, default=200, help="Number of queries")
+    parser.add_argument("--k", type=int, default=10, help="Neighbours per query (match_limit)")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        vectors = synthetic_vectors(args.synthetic)
+        source = f"{args.synthetic} synthetic vectors"
+    else:
+        _, vectors = load_professor_vectors()
+        source = "professors_dataset"
+    if not len(vectors):
+        print("No vectors to measure.")
+        return
+    queries = make_queries(vectors, args.queries)
+    dim = vectors.shape[1]
+    print(f"{len(vectors)} x {dim} vectors from {source}, {len(queries)} queries, k={args.k}")
+
+    expected_ids, expected_distances = VectorIndex(vectors).search(queries, args.k)
+    sample = vectors[:min(len(vectors), 100)]
+    float32_payload = np.mean([len(json.dumps(v.astype(float).tolist())) for v in sample])
+    print(f"{'precision':<11}{'bytes/vec':>10}{'file/vec':>10}{'upload/vec':>12}{'recall@k':>10}{'top-1':>8}{'dist err':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for precision in PRECISIONS:
+            path = save_vectors(vectors, range(len(vectors)), os.path.join(tmp, f"{precision}.npz"), precision)
+            file_bytes = os.path.getsize(path) / len(vectors)
+            payload = np.mean([len(json.dumps(format_for_upload(v.astype(float).tolist(), precision))) for v in sample])
+
+            ids, distances = VectorIndex(round_trip(vectors, precision)).search(queries, args.k)
+            recall = np.mean([len(set(a) & set(b)) / args.k for a, b in zip(ids, expected_ids)])
+            top1 = np.mean(ids[:, 0] == expected_ids[:, 0])
+            error = np.mean(np.abs(distances - expected_distances) / np.maximum(expected_distances, 1e-6))
+            print(f"{precision:<11}{bytes_per_vector(dim, precision):>10}{file_bytes:>10.0f}{payload:>12.0f}"
+                  f"{recall:>10.3f}{top1:>8.3f}{error:>10.4f}")
+    print(f"upload/vec is JSON characters per embedding ({float32_payload:.0f} for float32); "
+          "dist err is the mean relative error of the returned distances.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark: text_cleaning vs the scrapers' previous clean_text/remove_artifacts, on the
+pages stored in the HTTP cache (run a scraper first to populate it). Every input is also
+checked to produce identical output, so cached LLM/embedding keys stay valid.
+
+    python bench_text_cleaning.py [--repeat N] [--limit PAGES]
+"""
+import argparse
+import glob
+import os
+import re
+import time
+
+from bs4 import BeautifulSoup
+
+from http_cache import CACHE_DIR
+from text_cleaning import clean_list, clean_text
+
+
+def legacy_remove_artifacts(text):
+    text = re.sub(r'>>?endobj.*?obj<</D.*?>>', '', text, flags=re.DOTALL)
+    lines = text.splitlines()
+    lines = [line for line in lines if "endobj" not in line.lower() and "obj<</d" not in line.lower()]
+    return "\n".join(lines)
+
+
+def legacy_clean_text(text, artifacts=False):
+    if not text:
+        return ""
+    text = ''.join(ch for ch in text if ch.isprintable())
+    if artifacts:
+        text = legacy_remove_artifacts(text)
+    text = re.sub(r'\s+', ' ', text)
+    return text.strip()
+
+
+def legacy_clean_list(lst, artifacts=False):
+    return [legacy_clean_text(item, artifacts) for item in lst if legacy_clean_text(item, artifacts)]
+
+
+def page_inputs(html):
+    """What a scraper cleans for one page: the full text, each paragraph, and each text node as a list."""
+    soup = BeautifulSoup(html, "html.parser")
+    full_text = soup.get_text(separator=" ", strip=True)
+    paragraphs = [p.get_text(separator=" ") for p in soup.find_all("p")]
+    fields = list(soup.stripped_strings)
+    return full_text, paragraphs, fields
+
+
+def clean_page(inputs, text_fn, list_fn, artifacts):
+    full_text, paragraphs, fields = inputs
+    return ([text_fn(full_text, artifacts)], [text_fn(p, artifacts) for p in paragraphs], list_fn(fields, artifacts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark text cleaning on cached pages")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing runs per implementation (best is reported)")
+    parser.add_argument("--limit", type=int, default=None, help="Use at most this many cached pages")
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(CACHE_DIR, "bodies", "*.html")))[:args.limit]
+    if not paths:
+        print(f"No cached pages in {CACHE_DIR}; run a scraper first.")
+        return
+    pages = []
+    for path in paths:
+        with open(path, "rb") as f:
+            pages.append(page_inputs(f.read().decode("utf-8", errors="replace")))
+
+    for artifacts in (False, True):
+        label = "with artifact removal (CS)" if artifacts else "plain (biology, math)"
+        timings = {}
+        for name, text_fn, list_fn in (("before", legacy_clean_text, legacy_clean_list), ("after", clean_text, clean_list)):
+            best = float("inf")
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                for inputs in pages:
+                    clean_page(inputs, text_fn, list_fn, artifacts)
+                best = min(best, time.perf_counter() - start)
+            timings[name] = best
+        mismatches = sum(clean_page(inputs, legacy_clean_text, legacy_clean_list, artifacts)
+                         != clean_page(inputs, clean_text, clean_list, artifacts) for inputs in pages)
+        print(f"{label}: before {timings['before'] / len(pages) * 1000:.2f} ms/page, "
+              f"after {timings['after'] / len(pages) * 1000:.2f} ms/page "
+              f"({timings['before'] / timings['after']:.1f}x), {mismatches} page(s) with different output")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark: recall@k and per-query latency of IVFIndex settings against the exact scan
+(VectorIndex, i.e. what match_professors returns), to pick n_lists / n_probe from data.
+
+By default it indexes the combined professors dataset (embeddings come from the embedding
+cache); its own vectors, lightly perturbed, are the queries. --synthetic N instead indexes N
+clustered unit vectors, for sizes beyond the current dataset.
+
+    python bench_vector_index.py [--synthetic N] [--queries Q] [--k K] [--lists L] [--probes 1,2,4,8]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from vector_index import IVFIndex, VectorIndex, load_professor_vectors
+
+ADA_DIMENSIONS = 1536
+
+
+def synthetic_vectors(n, dim=ADA_DIMENSIONS, clusters=None, seed=0):
+    """Unit vectors scattered around random topic centres (embeddings cluster by research area)."""
+    rng = np.random.default_rng(seed)
+    clusters = clusters or max(1, n // 200)
+    centres = rng.normal(size=(clusters, dim)).astype(np.float32)
+    vectors = centres[rng.integers(0, clusters, n)] + 3.0 * rng.normal(size=(n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def make_queries(vectors, count, seed=1):
+    """Perturbed copies of random indexed vectors, re-normalized like real embeddings."""
+    rng = np.random.default_rng(seed)
+    queries = vectors[rng.choice(len(vectors), count, replace=len(vectors) < count)]
+    queries = queries + 0.02 * rng.normal(size=queries.shape).astype(np.float32)
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+
+def per_query_ms(search, queries):
+    """Median latency of answering queries one at a time (how the API serves them)."""
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        search(query)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings)) * 1000
+
+
+def recall(found, expected):
+    k = expected.shape[1]
+    return float(np.mean([len(set(f) & set(e)) / k for f, e in zip(found, expected)]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark exact vs IVF vector search")
+    parser.add_argument("--synthetic", type=int, default=None, help="Index this many synthetic vectors instead of the dataset")
+    parser.add_argument("--queries", type=int, default=200, help="Number of queries")
+    parser.add_argument("--k", type=int, default=10, help="Neighbours per query (match_limit)")
+    parser.add_argument("--lists", type=int, default=None, help="IVF lists (default: about sqrt of the vector count)")
+    parser.add_argument("--probes", default="1,2,4,8,16,32", help="Comma-separated n_probe values to try")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        vectors = synthetic_vectors(args.synthetic)
+        source = f"{args.synthetic} synthetic vectors"
+    else:
+        _, vectors = load_professor_vectors()
+        source = "professors_dataset"
+    if not len(vectors):
+        print("No vectors to index.")
+        return
+    queries = make_queries(vectors, args.queries)
+    print(f"{len(vectors)} x {vectors.shape[1]} vectors from {source}, {len(queries)} queries, k={args.k}")
+
+    exact = VectorIndex(vectors)
+    expected = exact.search(queries, args.k)[0]
+    exact_ms = per_query_ms(lambda q: exact.search(q, args.k), queries)
+    start = time.perf_counter()
+    exact.search(queries, args.k)
+    batch_ms = (time.perf_counter() - start) / len(queries) * 1000
+    print(f"{'exact':<22}{'recall 1.000':>14}{exact_ms:>10.2f} ms/query  ({batch_ms:.3f} ms/query batched)")
+
+    ivf = IVFIndex(vectors, n_lists=args.lists)
+    print(f"IVF: {ivf.n_lists} lists, built in {ivf.build_seconds:.2f}s")
+    for n_probe in (int(p) for p in args.probes.split(",")):
+        if n_probe > ivf.n_lists:
+            break
+        found = ivf.search(queries, args.k, n_probe=n_probe)[0]
+        ivf_ms = per_query_ms(lambda q: ivf.search(q, args.k, n_probe=n_probe), queries)
+        print(f"{f'ivf n_probe={n_probe}':<22}{f'recall {recall(found, expected):.3f}':>14}{ivf_ms:>10.2f} ms/query"
+              f"  ({exact_ms / ivf_ms:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
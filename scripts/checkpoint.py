@@ -0,0 +1,74 @@
+import json
+import os
+import threading
+
+# Append-only JSONL journals under scripts/data/checkpoints, one per pipeline. Each line is
+# {"stage": ..., "key": ..., "record": {...}} written as soon as a professor finishes a stage,
+# so a crashed run can pick up where it stopped with --resume.
+CHECKPOINT_DIR = os.path.join(os.path.dirname(__file__), 'data', 'checkpoints')
+
+
+class CheckpointJournal:
+    """Per-pipeline journal of completed (stage, key) -> record entries."""
+
+    def __init__(self, name: str, resume: bool = False, directory: str = CHECKPOINT_DIR):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f"{name}.jsonl")
+        self._lock = threading.Lock()
+        self._done = {}
+        if resume:
+            self._load()
+        else:
+            # A fresh run starts a fresh journal.
+            open(self.path, "w").close()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A crash mid-write can leave a partial last line; that record is simply redone.
+                    continue
+                self._done.setdefault(entry["stage"], {})[entry["key"]] = entry["record"]
+        counts = ", ".join(f"{len(records)} {stage}" for stage, records in self._done.items())
+        print(f"Resuming from checkpoint {self.path}: {counts or 'nothing completed yet'}")
+
+    def get(self, stage: str, key: str):
+        return self._done.get(stage, {}).get(key)
+
+    def records(self, stage: str) -> list:
+        """Records completed for a stage, in the order they were journaled."""
+        return list(self._done.get(stage, {}).values())
+
+    def keys(self, stage: str) -> set:
+        return set(self._done.get(stage, {}))
+
+    def append(self, stage: str, key: str, record: dict) -> dict:
+        line = json.dumps({"stage": stage, "key": key, "record": record}, default=str)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._done.setdefault(stage, {})[key] = json.loads(line)["record"]
+        return record
+
+    def process(self, stage: str, records: list, fn, key_fn, map_fn=map) -> list:
+        """
+        Apply fn to each record, reusing journaled results for keys already completed at
+        this stage and journaling each new result as soon as it is produced. map_fn may run
+        the pending records concurrently as long as it returns results in input order.
+        """
+        keys = [key_fn(record) for record in records]
+        results = [self.get(stage, key) for key in keys]
+        pending = [i for i, done in enumerate(results) if done is None]
+
+        def run(i):
+            return self.append(stage, keys[i], fn(records[i]))
+
+        for i, result in zip(pending, map_fn(run, pending)):
+            results[i] = result
+        return results
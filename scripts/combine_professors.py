@@ -1,58 +1,42 @@
-import os
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
+from dataset_io import load_dataset, save_dataset
 from scrape_cs_professors import run_cs_pipeline
 from scrape_biology_professors import run_biology_pipeline
 from scrape_math_professors import run_math_pipeline
-from supabase_upload import upload_to_supabase  # import the supabase upload function
+from supabase_upload import SYNC_KEYS, upload_to_supabase  # import the supabase upload function
+import html_parsing
+import instrumentation
+
+# Per-department datasets written by each pipeline, in the order they are combined.
+DEPARTMENT_DATASETS = {
+    "CS": "cs_professors_dataset",
+    "Biology": "biology_professors_dataset",
+    "Math": "math_professors_dataset",
+}
 
 def combine_professor_data():
     """
-    Combine CS, Biology, and Math professor data CSV files into a master CSV file.
-    Assumes that the following files exist in the local 'data' directory:
-      - cs_professors_dataset.csv
-      - biology_professors_dataset.csv
-      - math_professors_dataset.csv
+    Combine the CS, Biology, and Math professor datasets into the master dataset
+    (data/professors_dataset.parquet, plus its CSV export). Reads whichever of
+    these exist in the local 'data' directory (Parquet preferred, CSV otherwise):
+      - cs_professors_dataset
+      - biology_professors_dataset
+      - math_professors_dataset
     Returns the combined DataFrame.
     """
     print("Starting to combine professor data...")
 
-    # Use a data folder relative to this file.
-    data_dir = os.path.join(os.path.dirname(__file__), 'data')
-    os.makedirs(data_dir, exist_ok=True)
-
-    cs_file = os.path.join(data_dir, 'cs_professors_dataset.csv')
-    bio_file = os.path.join(data_dir, 'biology_professors_dataset.csv')
-    math_file = os.path.join(data_dir, 'math_professors_dataset.csv')
-    master_file = os.path.join(data_dir, 'professors_dataset.csv')
-
     dfs = []
-
-    # CS
-    if os.path.exists(cs_file):
-        print("Reading CS professors data...")
-        cs_df = pd.read_csv(cs_file)
-        print(f"Found {len(cs_df)} CS professors")
-        dfs.append(cs_df)
-    else:
-        print("CS data file not found; skipping.")
-
-    # Biology
-    if os.path.exists(bio_file):
-        print("Reading Biology professors data...")
-        bio_df = pd.read_csv(bio_file)
-        print(f"Found {len(bio_df)} Biology professors")
-        dfs.append(bio_df)
-    else:
-        print("Biology data file not found; skipping.")
-
-    # Math
-    if os.path.exists(math_file):
-        print("Reading Math professors data...")
-        math_df = pd.read_csv(math_file)
-        print(f"Found {len(math_df)} Math professors")
-        dfs.append(math_df)
-    else:
-        print("Math data file not found; skipping.")
+    for label, name in DEPARTMENT_DATASETS.items():
+        df = load_dataset(name)
+        if df is None:
+            print(f"{label} data file not found; skipping.")
+            continue
+        print(f"Found {len(df)} {label} professors")
+        dfs.append(df)
 
     if not dfs:
         print("No professor data to combine.")
@@ -62,42 +46,126 @@ def combine_professor_data():
     combined_df = pd.concat(dfs, ignore_index=True)
     print(f"Total professors in combined dataset: {len(combined_df)}")
 
-    print(f"Saving combined data to {master_file}...")
-    combined_df.to_csv(master_file, index=False)
+    save_dataset(combined_df, "professors_dataset")
     print("Successfully created master professors dataset!")
     
     return combined_df
 
-def main():
-    print("Starting professor data collection and combination process...")
+# Department pipelines, in the order the sequential run uses.
+PIPELINES = {
+    "CS": run_cs_pipeline,
+    "Biology": run_biology_pipeline,
+    "Math": run_math_pipeline,
+}
 
-    # Run individual pipelines.
-    print("\nRunning CS professor pipeline...")
-    cs_professors = run_cs_pipeline()
-    if not cs_professors:
-        print("No CS professor data scraped.")
+def run_department_pipeline(name, resume=False):
+    """Run one department's pipeline by name (top-level so worker processes can import it)."""
+    return PIPELINES[name](resume=resume)
 
-    print("\nRunning Biology professor pipeline...")
-    bio_professors = run_biology_pipeline()
-    if not bio_professors:
-        print("No Biology professor data scraped.")
+def run_department_worker(name, resume=False):
+    """
+    run_department_pipeline inside a --parallel worker process. The departments already
+    run side by side, so pages are parsed inline rather than in a nested process pool.
+    """
+    html_parsing.PARSE_WORKERS = 1
+    return run_department_pipeline(name, resume)
+
+def run_pipelines_parallel(names=None, resume=False):
+    """
+    Run the department pipelines concurrently, each in its own worker process so a crash
+    (even a hard one) in one department cannot take down the others.
+    Returns {department: professors list, or None if that pipeline failed}.
+    """
+    names = list(names or PIPELINES)
+    # Spawn rather than fork: the fetch engine and OpenAI clients own threads and sockets.
+    context = multiprocessing.get_context("spawn")
+    executors = {name: ProcessPoolExecutor(max_workers=1, mp_context=context) for name in names}
+    # Each worker hands back its timings and counters with its result for the run report.
+    futures = {name: executor.submit(instrumentation.call_and_drain, run_department_worker, name, resume)
+               for name, executor in executors.items()}
+    results = {}
+    for name, future in futures.items():
+        try:
+            results[name], metrics = future.result()
+            instrumentation.merge(metrics)
+        except Exception as e:
+            print(f"❌ {name} pipeline failed: {e!r}")
+            results[name] = None
+        finally:
+            executors[name].shutdown()
+    return results
+
+def report_run(run_mode, upload_mode):
+    """Print the per-stage timing summary and save the JSON run report."""
+    instrumentation.print_summary()
+    path = instrumentation.write_report(extra={"run_mode": run_mode, "upload_mode": upload_mode})
+    print(f"Run report saved to {path}")
+
+def main(stream=False, parallel=False, resume=False, upload_mode="reset", sync_key=SYNC_KEYS[0]):
+    if stream:
+        # Scrape, summarize, embed and upload each professor as it is ready instead of phase by phase.
+        from streaming_pipeline import run_streaming_pipeline
+        print("Starting streaming professor pipeline...")
+        if resume:
+            print("Note: --resume applies to phase-by-phase runs; use --upload-mode sync to skip unchanged professors when streaming.")
+        run_streaming_pipeline(upload_mode=upload_mode, sync_key=sync_key)
+        report_run("stream", upload_mode)
+        print("\nProcess completed successfully!")
+        return
 
-    print("\nRunning Math professor pipeline...")
-    math_professors = run_math_pipeline()
-    if not math_professors:
-        print("No Math professor data scraped.")
+    print("Starting professor data collection and combination process...")
 
-    # Combine CSV files from all pipelines.
+    if parallel:
+        # The departments hit different hosts and share no state, so run them side by side.
+        print("\nRunning CS, Biology and Math professor pipelines in parallel...")
+        results = run_pipelines_parallel(resume=resume)
+        for name, professors in results.items():
+            if professors is None:
+                print(f"{name} pipeline failed; combining its last saved dataset if one exists.")
+            elif not professors:
+                print(f"No {name} professor data scraped.")
+    else:
+        # Run individual pipelines.
+        print("\nRunning CS professor pipeline...")
+        cs_professors = run_cs_pipeline(resume=resume)
+        if not cs_professors:
+            print("No CS professor data scraped.")
+
+        print("\nRunning Biology professor pipeline...")
+        bio_professors = run_biology_pipeline(resume=resume)
+        if not bio_professors:
+            print("No Biology professor data scraped.")
+
+        print("\nRunning Math professor pipeline...")
+        math_professors = run_math_pipeline(resume=resume)
+        if not math_professors:
+            print("No Math professor data scraped.")
+
+    # Combine the datasets from all pipelines.
     combined_df = combine_professor_data()
     if combined_df is None:
         print("No data combined, exiting.")
+        report_run("parallel" if parallel else "sequential", upload_mode)
         return
 
     # Now, call the Supabase upload module to save the data into your Supabase vector db.
     print("\nUploading combined professor data to Supabase...")
-    upload_to_supabase(combined_df)
+    upload_to_supabase(combined_df, mode=upload_mode, sync_key=sync_key)
 
+    report_run("parallel" if parallel else "sequential", upload_mode)
     print("\nProcess completed successfully!")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Scrape, combine and upload professor data")
+    parser.add_argument("--stream", action="store_true",
+                        help="Stream each professor through summarize/classify/embed/upload instead of running phase by phase")
+    parser.add_argument("--parallel", action="store_true",
+                        help="Run the CS, Biology and Math pipelines concurrently in separate processes")
+    parser.add_argument("--resume", action="store_true",
+                        help="Skip professors already scraped/summarized according to each pipeline's checkpoint journal")
+    parser.add_argument("--upload-mode", choices=["reset", "sync"], default="reset",
+                        help="reset: wipe and reload the table; sync: upsert/delete only what changed")
+    parser.add_argument("--sync-key", choices=SYNC_KEYS, default=SYNC_KEYS[0],
+                        help="Identity column used to match professors in sync mode")
+    args = parser.parse_args()
+    main(stream=args.stream, parallel=args.parallel, resume=args.resume, upload_mode=args.upload_mode, sync_key=args.sync_key)
@@ -0,0 +1,154 @@
+import ast
+import importlib.util
+import os
+
+import numpy as np
+import pandas as pd
+
+# ----------------------------
+# Professor Datasets
+# ----------------------------
+# Each pipeline stage hands the next one a typed Parquet file: list fields are stored as
+# native list<string> columns, so combine and upload read them back as lists instead of
+# re-parsing stringified Python lists out of CSV cells. A CSV copy is still written next
+# to it as a human-readable export. Without pyarrow, datasets fall back to CSV only.
+PARQUET_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+
+LIST_FIELDS = ("classes_teaching", "research_areas", "preferred_majors")
+# Optional vector column (e.g. precomputed research_description embeddings).
+EMBEDDING_FIELD = "embedding"
+
+
+# List-field strings that mean "nothing here" (e.g. biology's "N/A" for classes_teaching).
+EMPTY_LIST_VALUES = {"", "[]", "nan", "n/a"}
+
+
+def convert_list_field(value):
+    """
+    Convert a list field into a proper Python list.
+    Lists pass through; arrays and tuples (as read from Parquet) become lists. A list
+    literal such as "['x', 'y']" (as written to CSV) is parsed with ast.literal_eval;
+    any other string becomes an empty list, as it always has for uploads (e.g. the math
+    scraper's office in classes_teaching is not a class).
+    """
+    if isinstance(value, list):
+        return value
+    if isinstance(value, (np.ndarray, tuple)):
+        return value.tolist() if isinstance(value, np.ndarray) else list(value)
+    if isinstance(value, str):
+        trimmed = value.strip()
+        if trimmed.lower() in EMPTY_LIST_VALUES:
+            return []
+        if trimmed.startswith("[") and trimmed.endswith("]"):
+            try:
+                # Safely evaluate the string (e.g., "['x', 'y']") into a list
+                evaluated = ast.literal_eval(trimmed)
+                if isinstance(evaluated, list):
+                    return evaluated
+            except (ValueError, SyntaxError) as e:
+                print(f"Warning: Could not convert field value '{value}' to list: {e}")
+    return []
+
+
+def convert_list_column(values) -> list:
+    """
+    convert_list_field over a whole column. Each distinct string is parsed only once
+    (CSV list columns repeat the same few literals, e.g. "[]"); every row still gets
+    its own list object.
+    """
+    parsed = {}
+    converted = []
+    for value in values:
+        kind = type(value)
+        if kind is np.ndarray:
+            converted.append(value.tolist())
+        elif kind is str:
+            if value not in parsed:
+                parsed[value] = convert_list_field(value)
+            converted.append(list(parsed[value]))
+        else:
+            converted.append(list(convert_list_field(value)))
+    return converted
+
+
+def dataset_path(name: str, fmt: str = None) -> str:
+    """Path of a dataset in the data folder; fmt defaults to parquet when pyarrow is installed."""
+    fmt = fmt or ("parquet" if PARQUET_AVAILABLE else "csv")
+    return os.path.join(DATA_DIR, f"{name}.{fmt}")
+
+
+def _normalize(record: dict) -> dict:
+    """List fields as lists of strings, every other missing value (NaN) as None."""
+    record = dict(record)
+    for key, value in record.items():
+        if key in LIST_FIELDS:
+            record[key] = [str(item) for item in convert_list_field(value)]
+        elif key == EMBEDDING_FIELD:
+            record[key] = [float(x) for x in convert_list_field(value)] or None
+        elif isinstance(value, float) and pd.isna(value):
+            record[key] = None
+    return record
+
+
+def _to_table(records: list, columns: list):
+    import pyarrow as pa
+
+    fields = []
+    for column in columns:
+        if column in LIST_FIELDS:
+            fields.append(pa.field(column, pa.list_(pa.string())))
+        elif column == EMBEDDING_FIELD:
+            fields.append(pa.field(column, pa.list_(pa.float32())))
+        else:
+            fields.append(pa.field(column, pa.string()))
+    values = {column: [record.get(column) for record in records] for column in columns}
+    for field in fields:
+        if field.type == pa.string():
+            values[field.name] = [None if value is None else str(value) for value in values[field.name]]
+    return pa.table(values, schema=pa.schema(fields))
+
+
+def save_dataset(professors, name: str):
+    """
+    Save professors (a list of dicts or a DataFrame) as data/<name>.parquet plus the
+    data/<name>.csv export. Returns the path of the primary file, or None if there is no data.
+    """
+    if isinstance(professors, pd.DataFrame):
+        professors = professors.to_dict("records")
+    if not professors:
+        print("⚠️ No data to save.")
+        return None
+    os.makedirs(DATA_DIR, exist_ok=True)
+
+    records = [_normalize(prof) for prof in professors]
+    columns = list(dict.fromkeys(key for record in records for key in record))
+    csv_path = dataset_path(name, "csv")
+    pd.DataFrame(records, columns=columns).to_csv(csv_path, index=False)
+    if not PARQUET_AVAILABLE:
+        print(f"Saved {len(records)} professors to {csv_path} (install pyarrow for the Parquet dataset)")
+        return csv_path
+
+    import pyarrow.parquet as pq
+
+    parquet_path = dataset_path(name, "parquet")
+    pq.write_table(_to_table(records, columns), parquet_path)
+    print(f"Saved {len(records)} professors to {parquet_path} (CSV export: {csv_path})")
+    return parquet_path
+
+
+def read_dataset(path: str) -> pd.DataFrame:
+    """Read a .parquet or .csv professors file into a DataFrame."""
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+def load_dataset(name: str):
+    """Load data/<name>, preferring the Parquet file over the CSV export. Returns None if neither exists."""
+    candidates = (["parquet"] if PARQUET_AVAILABLE else []) + ["csv"]
+    for fmt in candidates:
+        path = dataset_path(name, fmt)
+        if os.path.exists(path):
+            return read_dataset(path)
+    return None
@@ -0,0 +1,62 @@
+import hashlib
+import os
+import re
+import sqlite3
+from array import array
+
+# Persistent embedding store under scripts/data, keyed by a hash of model name + normalized text,
+# so a professor whose research_description has not changed is never re-embedded.
+CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", os.path.join(os.path.dirname(__file__), 'data', 'embedding_cache.sqlite'))
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so formatting-only differences share a cache entry."""
+    return _WHITESPACE.sub(' ', text).strip()
+
+
+def cache_key(model: str, text: str) -> str:
+    return hashlib.sha256(f"{model}\n{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """SQLite-backed map of cache_key(model, text) -> embedding vector (stored as float64 blobs)."""
+
+    def __init__(self, path: str = CACHE_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Same settings as the LLM cache: parallel department workers share this file, so
+        # readers must not block the writer and a locked database is waited on, not an error.
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key TEXT PRIMARY KEY, model TEXT NOT NULL, dim INTEGER NOT NULL, vector BLOB NOT NULL)"
+        )
+
+    def get_many(self, keys) -> dict:
+        """Return {key: embedding} for the keys that are cached."""
+        found = {}
+        keys = list(set(keys))
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.conn.execute(f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk)
+            for key, blob in rows:
+                found[key] = array('d', blob).tolist()
+        return found
+
+    def put_many(self, model: str, items):
+        """Store (key, embedding) pairs; empty embeddings are ignored."""
+        rows = [(key, model, len(vec), array('d', vec).tobytes()) for key, vec in items if vec]
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?)", rows)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,161 @@
+import os
+import time
+import threading
+import openai
+from concurrent.futures import ThreadPoolExecutor
+import instrumentation
+from embedding_cache import EmbeddingCache, cache_key
+from token_budget import EMBEDDING_INPUT_TOKENS, count_tokens, truncate_to_budget
+from dotenv import load_dotenv
+
+load_dotenv()
+openai.api_key = os.getenv("OPENAI_API_KEY")
+if not openai.api_key:
+    raise ValueError("Please set the OPENAI_API_KEY environment variable in your .env file")
+
+# Batched, cached OpenAI embeddings, shared by the upload step and area_classifier.
+EMBEDDING_MODEL = "text-embedding-ada-002"
+
+# Batching limits for the embeddings endpoint. The API accepts up to 2048 inputs and
+# ~300k tokens per request; stay well under both.
+EMBEDDING_BATCH_SIZE = 256
+EMBEDDING_BATCH_TOKENS = 100_000
+EMBEDDING_WORKERS = 3
+EMBEDDING_REQUESTS_PER_MINUTE = 300
+
+
+def get_embedding(text: str) -> list:
+    """
+    Generate an embedding for the given text using OpenAI's text-embedding-ada-002 model.
+    Returns a list of floats (the embedding vector) or an empty list if something goes wrong.
+    """
+    if not isinstance(text, str):
+        return []
+    if not text.strip():
+        return []
+    text = truncate_to_budget(text, EMBEDDING_INPUT_TOKENS)
+    try:
+        response = openai.embeddings.create(
+            input=[text],
+            model=EMBEDDING_MODEL
+        )
+        _count_embedding_call(response)
+        return response.data[0].embedding
+    except Exception as e:
+        print("Error generating embedding:", e)
+        return []
+
+
+def _count_embedding_call(response):
+    instrumentation.count("embedding_api_calls")
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        instrumentation.count("embedding_tokens", usage.total_tokens)
+
+
+def estimate_tokens(text: str) -> int:
+    """Token count used to size embedding batches (see token_budget.count_tokens)."""
+    return count_tokens(text)
+
+
+class RequestRateLimiter:
+    """Thread-safe limiter that spaces requests evenly to stay under a requests-per-minute budget."""
+
+    def __init__(self, requests_per_minute: int):
+        self.interval = 60.0 / requests_per_minute
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next_slot, now)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def make_embedding_batches(texts, max_inputs=EMBEDDING_BATCH_SIZE, max_tokens=EMBEDDING_BATCH_TOKENS):
+    """
+    Group (id, text) pairs into batches that respect the per-request input-count
+    and token limits. Returns a list of lists of (id, text).
+    """
+    batches = []
+    current, current_tokens = [], 0
+    for item_id, text in texts:
+        tokens = estimate_tokens(text)
+        if current and (len(current) >= max_inputs or current_tokens + tokens > max_tokens):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append((item_id, text))
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _embed_batch(batch, limiter):
+    """Embed one batch; on failure fall back to per-text requests so one bad input can't sink the batch."""
+    limiter.wait()
+    try:
+        response = openai.embeddings.create(
+            input=[text for _, text in batch],
+            model=EMBEDDING_MODEL
+        )
+        _count_embedding_call(response)
+        ordered = sorted(response.data, key=lambda item: item.index)
+        return [(item_id, item.embedding) for (item_id, _), item in zip(batch, ordered)]
+    except Exception as e:
+        print(f"Error generating embeddings for batch of {len(batch)}: {e}; retrying individually.")
+        results = []
+        for item_id, text in batch:
+            limiter.wait()
+            results.append((item_id, get_embedding(text)))
+        return results
+
+
+@instrumentation.instrumented("embed")
+def get_embeddings(texts, use_cache: bool = True) -> list:
+    """
+    Generate embeddings for many texts with as few requests as possible.
+    Texts already in the embedding cache (same model + normalized text) are served
+    locally; the rest are deduplicated, packed into batches, and a few batches run
+    concurrently under a rate limiter. Results come back aligned with the input order.
+    Entries that are empty, non-string, or fail come back as an empty list.
+    """
+    # Over-long inputs would be rejected by the API; trim them to the model's limit first.
+    texts = [truncate_to_budget(t, EMBEDDING_INPUT_TOKENS) for t in texts]
+    embeddings = [[] for _ in texts]
+    keys = {i: cache_key(EMBEDDING_MODEL, t) for i, t in enumerate(texts) if isinstance(t, str) and t.strip()}
+    if not keys:
+        return embeddings
+
+    cache = EmbeddingCache() if use_cache else None
+    try:
+        by_key = cache.get_many(keys.values()) if cache else {}
+        missing = {}
+        for i, key in keys.items():
+            if key not in by_key:
+                missing.setdefault(key, texts[i])
+        instrumentation.count("embedding_cache_hits", len(keys) - sum(k in missing for k in keys.values()))
+        print(f"Embedding cache: {len(keys) - sum(k in missing for k in keys.values())} hit(s), "
+              f"{len(missing)} unique text(s) to embed.")
+
+        batches = make_embedding_batches(missing.items())
+        if batches:
+            print(f"Embedding {len(missing)} texts in {len(batches)} request(s)...")
+            limiter = RequestRateLimiter(EMBEDDING_REQUESTS_PER_MINUTE)
+            fresh = []
+            with ThreadPoolExecutor(max_workers=EMBEDDING_WORKERS) as pool:
+                for results in pool.map(lambda batch: _embed_batch(batch, limiter), batches):
+                    fresh.extend(results)
+            by_key.update(fresh)
+            if cache:
+                cache.put_many(EMBEDDING_MODEL, fresh)
+    finally:
+        if cache:
+            cache.close()
+
+    for i, key in keys.items():
+        embeddings[i] = by_key.get(key, [])
+    return embeddings
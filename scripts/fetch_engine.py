@@ -0,0 +1,242 @@
+import asyncio
+import importlib.util
+import queue
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+from urllib.parse import urlparse
+
+import httpx
+from bs4 import BeautifulSoup, SoupStrainer
+
+import http_cache
+import instrumentation
+from html_parsing import parse_html
+
+# ----------------------------
+# Fetch Settings
+# ----------------------------
+# Maximum number of requests in flight at once across all hosts.
+MAX_CONCURRENCY = 8
+
+# Politeness limits in requests per second, per host. The old sequential
+# scrapers never exceeded about one request per second on any host: biology
+# slept 1s per page, CS fetched two pages then slept 1s, and math made two LLM
+# calls plus a 0.3s sleep per page. Sleep-only arithmetic (2 req/s for CS,
+# 3 req/s for math) ignores fetch and LLM latency and overstates those rates.
+# Different hosts still proceed in parallel.
+DEFAULT_HOST_RATE = 1.0
+HOST_RATE_LIMITS = {
+    "www.cs.purdue.edu": 1.0,
+    "www.bio.purdue.edu": 1.0,
+    "www.math.purdue.edu": 1.0,
+}
+
+REQUEST_TIMEOUT = 10
+
+# Connection pooling: one keep-alive client is shared by every fetch in the process,
+# so each host pays the TCP+TLS handshake once instead of once per page.
+# HTTP/2 is used when the optional h2 package is installed.
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+MAX_KEEPALIVE_CONNECTIONS = 16
+KEEPALIVE_EXPIRY = 30
+
+# Retry policy for timeouts, connection errors, 429 and 5xx responses:
+# exponential backoff with full jitter, honoring Retry-After when the server sends one.
+MAX_RETRIES = 4
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 30.0
+MAX_RETRY_AFTER = 120.0
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class HostRateLimiter:
+    """Space out requests to the same host so each host sees at most its configured rate."""
+
+    def __init__(self, host_rates=None, default_rate=DEFAULT_HOST_RATE):
+        self.host_rates = dict(HOST_RATE_LIMITS if host_rates is None else host_rates)
+        self.default_rate = default_rate
+        self._locks = {}
+        self._next_slot = {}
+
+    async def wait(self, host: str):
+        lock = self._locks.setdefault(host, asyncio.Lock())
+        interval = 1.0 / self.host_rates.get(host, self.default_rate)
+        async with lock:
+            now = time.monotonic()
+            slot = self._next_slot.get(host, now)
+            if slot > now:
+                await asyncio.sleep(slot - now)
+            self._next_slot[host] = max(slot, now) + interval
+
+
+def _retry_after_seconds(response) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds to wait."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
+
+
+def _backoff_seconds(attempt: int) -> float:
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+
+async def _get_with_retries(client, url, limiter, headers):
+    """GET url, retrying transient failures; raises once retries are exhausted."""
+    for attempt in range(MAX_RETRIES + 1):
+        with instrumentation.timed("fetch_wait"):
+            await limiter.wait(urlparse(url).netloc)
+        try:
+            with instrumentation.timed("fetch", url):
+                response = await client.get(url, headers=headers)
+        except (httpx.TimeoutException, httpx.TransportError) as e:
+            if attempt == MAX_RETRIES:
+                raise
+            delay = _backoff_seconds(attempt)
+            print(f"Retrying {url} in {delay:.1f}s after {type(e).__name__}")
+        else:
+            if response.status_code not in RETRY_STATUS_CODES or attempt == MAX_RETRIES:
+                return response
+            retry_after = _retry_after_seconds(response)
+            delay = retry_after if retry_after is not None else _backoff_seconds(attempt)
+            print(f"Retrying {url} in {delay:.1f}s after HTTP {response.status_code}")
+        await asyncio.sleep(delay)
+
+
+async def _fetch_one(client, url, limiter, semaphore) -> Tuple[str, Optional[str]]:
+    """
+    Fetch one URL; returns (url, text) or (url, None) on any failure.
+    Fresh cache entries are served from disk without touching the network; stale ones
+    are revalidated with a conditional request and reused on a 304.
+    """
+    cached = http_cache.load(url) if http_cache.is_enabled() else None
+    if cached and (http_cache.is_offline() or http_cache.is_fresh(cached)):
+        instrumentation.count("http_cache_hits")
+        return url, cached["body"]
+    if http_cache.is_offline():
+        print(f"Cache miss in offline mode: {url}")
+        return url, None
+
+    async with semaphore:
+        try:
+            response = await _get_with_retries(client, url, limiter, http_cache.conditional_headers(cached))
+            instrumentation.count("http_requests")
+            instrumentation.count("bytes_downloaded", len(response.content), url)
+            if response.status_code == 304 and cached:
+                instrumentation.count("http_not_modified")
+                http_cache.touch(cached, response.headers)
+                return url, cached["body"]
+            response.raise_for_status()
+            if http_cache.is_enabled():
+                http_cache.store(url, response.text, response.headers)
+            return url, response.text
+        except Exception as e:
+            print(f"Error fetching {url}: {e}")
+            return url, None
+
+
+# ----------------------------
+# Shared Client
+# ----------------------------
+# A single event loop thread owns the pooled client and the per-host rate limiter,
+# so pooled connections and politeness spacing carry over between fetch calls.
+_engine_lock = threading.Lock()
+_loop = None
+_client = None
+_limiter = None
+
+
+def _start_engine():
+    global _loop, _client, _limiter
+    with _engine_lock:
+        if _loop is not None:
+            return _loop
+        loop = asyncio.new_event_loop()
+        threading.Thread(target=loop.run_forever, name="fetch-engine", daemon=True).start()
+
+        async def setup():
+            limits = httpx.Limits(max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                                  keepalive_expiry=KEEPALIVE_EXPIRY)
+            client = httpx.AsyncClient(timeout=REQUEST_TIMEOUT, follow_redirects=True,
+                                       http2=HTTP2_AVAILABLE, limits=limits)
+            return client, HostRateLimiter()
+
+        _client, _limiter = asyncio.run_coroutine_threadsafe(setup(), loop).result()
+        _loop = loop
+        return _loop
+
+
+async def _fetch_into(urls, out_queue, max_concurrency, host_rates):
+    limiter = _limiter if host_rates is None else HostRateLimiter(host_rates)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    tasks = [asyncio.create_task(_fetch_one(_client, url, limiter, semaphore)) for url in urls]
+    for finished in asyncio.as_completed(tasks):
+        out_queue.put(await finished)
+
+
+def iter_pages(urls: Iterable[str], max_concurrency: int = MAX_CONCURRENCY,
+               host_rates=None) -> Iterator[Tuple[str, Optional[str]]]:
+    """
+    Fetch URLs concurrently and yield (url, text) pairs as each one completes.
+    Duplicate URLs are fetched once. Failed fetches yield (url, None), matching get_soup's contract.
+    The shared event loop runs on a worker thread so callers can stay synchronous.
+    """
+    unique_urls = list(dict.fromkeys(u for u in urls if u))
+    if not unique_urls:
+        return
+    results = queue.Queue()
+    done = object()
+    loop = _start_engine()
+    future = asyncio.run_coroutine_threadsafe(
+        _fetch_into(unique_urls, results, max_concurrency, host_rates), loop)
+    future.add_done_callback(lambda _: results.put(done))
+    while True:
+        item = results.get()
+        if item is done:
+            break
+        yield item
+    if future.exception():
+        print(f"Fetch engine error: {future.exception()}")
+
+
+def fetch_pages(urls: Iterable[str], **kwargs) -> Dict[str, Optional[str]]:
+    """Fetch URLs concurrently and return a dict of url -> text (None on failure)."""
+    return dict(iter_pages(urls, **kwargs))
+
+
+def make_soup(html: Optional[str], url: str, parse_only: Optional[SoupStrainer] = None) -> Optional[BeautifulSoup]:
+    """
+    Parse fetched HTML into a BeautifulSoup object with a base_url attribute, using the
+    html_parsing backend. parse_only (e.g. html_parsing.LINKS_ONLY) limits the tree built.
+    """
+    if html is None:
+        return None
+    with instrumentation.timed("parse", url):
+        return parse_html(html, url, parse_only)
+
+
+def iter_soups(urls: Iterable[str], parse_only: Optional[SoupStrainer] = None,
+               **kwargs) -> Iterator[Tuple[str, Optional[BeautifulSoup]]]:
+    """Like iter_pages, but yields parsed soups (None on failure)."""
+    for url, html in iter_pages(urls, **kwargs):
+        yield url, make_soup(html, url, parse_only)
+
+
+def get_soups(urls: Iterable[str], **kwargs) -> Dict[str, Optional[BeautifulSoup]]:
+    """Fetch and parse URLs concurrently; returns a dict of url -> soup (None on failure)."""
+    return dict(iter_soups(urls, **kwargs))
+
+
+def get_soup(url: str, parse_only: Optional[SoupStrainer] = None) -> Optional[BeautifulSoup]:
+    """Fetch URL content and return a BeautifulSoup object with base_url attribute."""
+    return get_soups([url], parse_only=parse_only).get(url)
@@ -0,0 +1,107 @@
+import functools
+import importlib.util
+import os
+from contextlib import contextmanager
+from multiprocessing import cpu_count, get_context
+from typing import Optional
+
+from bs4 import BeautifulSoup, CData, NavigableString, SoupStrainer, Tag
+
+import instrumentation
+
+# ----------------------------
+# Parser Backend
+# ----------------------------
+# lxml's C parser is several times faster than the pure-Python "html.parser"; it is used
+# when installed. Set HTML_PARSER to force a backend (e.g. "html.parser" to compare output).
+LXML_AVAILABLE = importlib.util.find_spec("lxml") is not None
+PARSER = os.getenv("HTML_PARSER") or ("lxml" if LXML_AVAILABLE else "html.parser")
+
+# Parsing is CPU-bound, so profile pages are parsed in a process pool. Workers get raw
+# (url, html) pages in chunks to amortize IPC and send back plain dicts, never soups.
+# Each spawned worker re-imports the scraper (OpenAI client, pandas), so the default is
+# capped; combine_professors --parallel sets it to 1 inside its department processes.
+MAX_DEFAULT_PARSE_WORKERS = 4
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", min(MAX_DEFAULT_PARSE_WORKERS, cpu_count())))
+PARSE_CHUNK_SIZE = 4
+
+# Listing pages are only mined for links, so only <a href> tags need to be built.
+LINKS_ONLY = SoupStrainer("a", href=True)
+
+# The strings soup.get_text() includes by default (no comments, scripts or styles).
+_TEXT_STRING_TYPES = (NavigableString, CData)
+
+
+def parse_html(html: str, url: Optional[str] = None, parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+    """Parse HTML with the configured backend, optionally keeping only what parse_only matches."""
+    soup = BeautifulSoup(html, PARSER, parse_only=parse_only)
+    soup.base_url = url
+    return soup
+
+
+def scan_page(soup: BeautifulSoup, string_patterns: dict, tag_groups: dict, guards: Optional[dict] = None) -> dict:
+    """
+    Collect everything a detail extractor needs in a single walk over the tree:
+      text:    same as soup.get_text(separator=" ", strip=True)
+      strings: name -> first string matching that compiled pattern (like soup.find(string=pattern)), or None
+      tags:    name -> every tag whose name is in that group's tuple (like soup.find_all(names)), in document order
+    guards optionally maps a pattern name to a substring every match must contain (e.g. "@"
+    for emails); strings without it skip that regex, which is most of the matching cost.
+    """
+    guards = guards or {}
+    texts = []
+    strings = dict.fromkeys(string_patterns)
+    pending = dict(string_patterns)
+    tags = {name: [] for name in tag_groups}
+    groups_by_tag = {}
+    for group, names in tag_groups.items():
+        for tag_name in names:
+            groups_by_tag.setdefault(tag_name, []).append(group)
+    for element in soup.descendants:
+        if isinstance(element, NavigableString):
+            if type(element) in _TEXT_STRING_TYPES:
+                stripped = element.strip()
+                if stripped:
+                    texts.append(stripped)
+            for name, pattern in list(pending.items()):
+                if guards.get(name, "") in element and pattern.search(element):
+                    strings[name] = element
+                    del pending[name]
+        elif isinstance(element, Tag) and element.name in groups_by_tag:
+            for group in groups_by_tag[element.name]:
+                tags[group].append(element)
+    return {"text": " ".join(texts), "strings": strings, "tags": tags}
+
+
+@contextmanager
+def extraction_pool(workers: Optional[int] = None):
+    """
+    Process pool for map_pages, or None (parse inline) with a single worker. workers
+    defaults to PARSE_WORKERS. Uses the spawn start method: the fetch engine's threads
+    are running and must not be forked.
+    """
+    workers = PARSE_WORKERS if workers is None else workers
+    if workers <= 1:
+        yield None
+        return
+    pool = get_context("spawn").Pool(workers)
+    try:
+        yield pool
+    finally:
+        pool.terminate()
+
+
+def map_pages(extract_fn, pages, pool=None, chunksize: int = PARSE_CHUNK_SIZE):
+    """
+    Apply extract_fn to each (url, html) page, in the pool when given, yielding results as
+    they finish (not in input order). extract_fn must be a module-level function that
+    returns picklable plain data. pages may be a generator; it is consumed as results flow.
+    """
+    if pool is None:
+        yield from map(extract_fn, pages)
+        return
+    # Workers send their instrumentation back with each result; fold it into this process.
+    for result, metrics in pool.imap_unordered(functools.partial(instrumentation.call_and_drain, extract_fn),
+                                               pages, chunksize):
+        instrumentation.merge(metrics)
+        yield result
@@ -0,0 +1,106 @@
+import hashlib
+import json
+import os
+import time
+from typing import Optional
+
+# ----------------------------
+# Cache Settings
+# ----------------------------
+# Cache layout under scripts/data/http_cache:
+#   entries/<sha256(url)>.json   -> url, ETag, Last-Modified, fetch time, body hash
+#   bodies/<sha256(body)>.html   -> page body (content-addressed, shared by identical pages)
+CACHE_DIR = os.getenv("HTTP_CACHE_DIR", os.path.join(os.path.dirname(__file__), 'data', 'http_cache'))
+
+# "on": serve fresh entries from disk and revalidate stale ones with conditional requests.
+# "off": always fetch from the network and leave the cache untouched.
+# "offline": cache-only mode; never touch the network, misses return None.
+CACHE_MODE = os.getenv("HTTP_CACHE_MODE", "on").lower()
+
+# Seconds an entry is served without revalidation. Faculty pages change rarely.
+CACHE_TTL = float(os.getenv("HTTP_CACHE_TTL", 24 * 60 * 60))
+
+
+def _hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _entry_path(url: str) -> str:
+    return os.path.join(CACHE_DIR, "entries", _hash(url.encode("utf-8")) + ".json")
+
+
+def _body_path(body_hash: str) -> str:
+    return os.path.join(CACHE_DIR, "bodies", body_hash + ".html")
+
+
+def _write_atomic(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def is_enabled() -> bool:
+    return CACHE_MODE != "off"
+
+
+def is_offline() -> bool:
+    return CACHE_MODE == "offline"
+
+
+def load(url: str) -> Optional[dict]:
+    """Return the cached entry for url (with its body under "body"), or None on a miss."""
+    try:
+        with open(_entry_path(url), "r", encoding="utf-8") as f:
+            entry = json.load(f)
+        with open(_body_path(entry["body_hash"]), "r", encoding="utf-8") as f:
+            entry["body"] = f.read()
+        return entry
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def store(url: str, body: str, headers) -> dict:
+    """Save a freshly downloaded page and its validators."""
+    encoded = body.encode("utf-8")
+    body_hash = _hash(encoded)
+    body_path = _body_path(body_hash)
+    if not os.path.exists(body_path):
+        _write_atomic(body_path, encoded)
+    entry = {
+        "url": url,
+        "etag": headers.get("ETag"),
+        "last_modified": headers.get("Last-Modified"),
+        "fetched_at": time.time(),
+        "body_hash": body_hash,
+    }
+    _write_atomic(_entry_path(url), json.dumps(entry).encode("utf-8"))
+    entry["body"] = body
+    return entry
+
+
+def touch(entry: dict, headers=None):
+    """Mark a cached entry as revalidated (after a 304), picking up any refreshed validators."""
+    headers = headers or {}
+    updated = {k: v for k, v in entry.items() if k != "body"}
+    updated["etag"] = headers.get("ETag") or entry.get("etag")
+    updated["last_modified"] = headers.get("Last-Modified") or entry.get("last_modified")
+    updated["fetched_at"] = time.time()
+    _write_atomic(_entry_path(entry["url"]), json.dumps(updated).encode("utf-8"))
+
+
+def is_fresh(entry: dict, ttl: float = None) -> bool:
+    ttl = CACHE_TTL if ttl is None else ttl
+    return time.time() - entry.get("fetched_at", 0) < ttl
+
+
+def conditional_headers(entry: Optional[dict]) -> dict:
+    """Build If-None-Match / If-Modified-Since headers for revalidating a cached entry."""
+    headers = {}
+    if entry:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
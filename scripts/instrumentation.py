@@ -0,0 +1,137 @@
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# ----------------------------
+# Run Metrics
+# ----------------------------
+# Process-wide, thread-safe tallies of where a run spends its time: per-stage timings
+# (fetch, parse, clean, summarize, classify, embed, upload, ...), per-URL fetch/parse
+# timings, and counters (bytes downloaded, API calls, tokens, cache hits). Worker
+# processes hand their metrics back with drain() and the parent folds them in with merge().
+REPORT_DIR = os.path.join(os.path.dirname(__file__), 'data', 'reports')
+
+_lock = threading.Lock()
+_stages = {}
+_counters = {}
+_urls = {}
+_started_at = time.time()
+
+
+def record(stage: str, seconds: float, url: str = None):
+    """Add one timed call of stage (optionally attributed to a URL)."""
+    with _lock:
+        entry = _stages.setdefault(stage, {"calls": 0, "seconds": 0.0, "max_seconds": 0.0})
+        entry["calls"] += 1
+        entry["seconds"] += seconds
+        entry["max_seconds"] = max(entry["max_seconds"], seconds)
+        if url:
+            per_url = _urls.setdefault(url, {})
+            per_url[stage] = per_url.get(stage, 0.0) + seconds
+
+
+def count(name: str, amount=1, url: str = None):
+    """Add amount to a counter (e.g. "bytes_downloaded", "llm_api_calls")."""
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+        if url:
+            per_url = _urls.setdefault(url, {})
+            per_url[name] = per_url.get(name, 0) + amount
+
+
+@contextmanager
+def timed(stage: str, url: str = None):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, time.perf_counter() - start, url)
+
+
+def instrumented(stage: str):
+    """Decorator form of timed() for functions that are a stage on their own."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timed(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def snapshot() -> dict:
+    with _lock:
+        return {
+            "stages": {name: dict(entry) for name, entry in _stages.items()},
+            "counters": dict(_counters),
+            "urls": {url: dict(entry) for url, entry in _urls.items()},
+        }
+
+
+def drain() -> dict:
+    """Return this process's metrics and reset them (for handing back from a worker)."""
+    with _lock:
+        metrics = {"stages": dict(_stages), "counters": dict(_counters), "urls": dict(_urls)}
+        _stages.clear()
+        _counters.clear()
+        _urls.clear()
+        return metrics
+
+
+def merge(metrics: dict):
+    """Fold metrics from drain() in another process into this one."""
+    if not metrics:
+        return
+    with _lock:
+        for name, other in metrics.get("stages", {}).items():
+            entry = _stages.setdefault(name, {"calls": 0, "seconds": 0.0, "max_seconds": 0.0})
+            entry["calls"] += other["calls"]
+            entry["seconds"] += other["seconds"]
+            entry["max_seconds"] = max(entry["max_seconds"], other["max_seconds"])
+        for name, value in metrics.get("counters", {}).items():
+            _counters[name] = _counters.get(name, 0) + value
+        for url, other in metrics.get("urls", {}).items():
+            per_url = _urls.setdefault(url, {})
+            for key, value in other.items():
+                per_url[key] = per_url.get(key, 0) + value
+
+
+def call_and_drain(fn, *args):
+    """Run fn(*args) in a worker and return (result, metrics recorded by the call)."""
+    drain()
+    result = fn(*args)
+    return result, drain()
+
+
+def write_report(path: str = None, extra: dict = None) -> str:
+    """Write the run's metrics (plus extra fields) as JSON; returns the path written."""
+    finished_at = time.time()
+    report = {"started_at": _started_at, "finished_at": finished_at,
+              "wall_seconds": finished_at - _started_at, **snapshot(), **(extra or {})}
+    if path is None:
+        os.makedirs(REPORT_DIR, exist_ok=True)
+        path = os.path.join(REPORT_DIR, time.strftime("run-%Y%m%d-%H%M%S.json", time.localtime(finished_at)))
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    return path
+
+
+def print_summary(slowest_urls: int = 5):
+    """Print a per-stage timing table, the counters, and the slowest URLs to fetch."""
+    metrics = snapshot()
+    wall = time.time() - _started_at
+    print(f"\nRun summary ({wall:.1f}s wall clock; stage times are summed across threads and processes)")
+    print(f"{'stage':<14}{'calls':>8}{'total s':>11}{'avg ms':>10}{'max ms':>10}")
+    for name, entry in sorted(metrics["stages"].items(), key=lambda item: -item[1]["seconds"]):
+        avg_ms = entry["seconds"] / entry["calls"] * 1000 if entry["calls"] else 0.0
+        print(f"{name:<14}{entry['calls']:>8}{entry['seconds']:>11.2f}{avg_ms:>10.1f}{entry['max_seconds'] * 1000:>10.1f}")
+    for name, value in sorted(metrics["counters"].items()):
+        print(f"{name:<30}{value:>14,}")
+    fetched = [(entry["fetch"], url) for url, entry in metrics["urls"].items() if "fetch" in entry]
+    if fetched:
+        print("Slowest fetches:")
+        for seconds, url in sorted(fetched, reverse=True)[:slowest_urls]:
+            print(f"  {seconds:8.2f}s  {url}")
@@ -0,0 +1,49 @@
+import re
+import threading
+
+_WORD_CHAR = re.compile(r"\w")
+
+
+class KeywordMatcher:
+    """
+    Case-insensitive whole-word matcher for a fixed keyword list, compiled once. The text is
+    lowercased once per call; each keyword is located with str's C substring search and only
+    keywords that occur at all are checked for word boundaries, so "Graphics" does not match
+    inside "Infographics".
+    """
+
+    def __init__(self, keywords):
+        self.keywords = list(dict.fromkeys(keywords))
+        # The word-start check is done by hand: a leading lookbehind would stop re from
+        # using its fast literal-prefix search.
+        self._patterns = {kw.lower(): re.compile(re.escape(kw.lower()) + r"(?!\w)") for kw in self.keywords}
+
+    def _whole_word_in(self, keyword: str, text_lower: str) -> bool:
+        if keyword not in text_lower:
+            return False
+        for match in self._patterns[keyword].finditer(text_lower):
+            start = match.start()
+            if start == 0 or not _WORD_CHAR.match(text_lower, start - 1):
+                return True
+        return False
+
+    def find_all(self, text: str) -> list:
+        """Keywords present in text as whole words, in keyword-list order."""
+        if not text:
+            return []
+        text_lower = text.lower()
+        found = {kw for kw in self._patterns if self._whole_word_in(kw, text_lower)}
+        return [kw for kw in self.keywords if kw.lower() in found]
+
+
+_matchers = {}
+_matchers_lock = threading.Lock()
+
+
+def get_matcher(keywords) -> KeywordMatcher:
+    """Shared matcher per keyword list, compiled on first use."""
+    key = tuple(keywords)
+    with _matchers_lock:
+        if key not in _matchers:
+            _matchers[key] = KeywordMatcher(key)
+        return _matchers[key]
@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import instrumentation
+from llm_executor import rate_limited_completion
+
+# Persistent chat-completion cache shared by the scrapers, keyed by the full request
+# (model, messages, sampling params) plus a prompt version, under scripts/data.
+CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(os.path.dirname(__file__), 'data', 'llm_cache.sqlite'))
+
+# Bump (or set LLM_PROMPT_VERSION) to stop reusing responses produced by older prompts.
+PROMPT_VERSION = os.getenv("LLM_PROMPT_VERSION", "1")
+
+# Least-recently-used entries beyond this many are evicted.
+MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 50_000))
+EVICT_EVERY = 100
+
+
+def request_key(params: dict, prompt_version: str = PROMPT_VERSION) -> str:
+    payload = json.dumps([prompt_version, params], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """SQLite-backed LRU cache of chat completion responses with hit/miss counters."""
+
+    def __init__(self, path: str = CACHE_PATH, max_entries: int = MAX_ENTRIES):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._puts = 0
+        self._lock = threading.Lock()
+        # Shared across threads (guarded by the lock); SQLite handles other processes.
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, prompt_version TEXT NOT NULL, model TEXT, response TEXT NOT NULL,"
+            " created_at REAL NOT NULL, last_used_at REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used_at)")
+
+    def get(self, key: str):
+        with self._lock:
+            row = self.conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            with self.conn:
+                self.conn.execute("UPDATE responses SET last_used_at = ? WHERE key = ?", (time.time(), key))
+            return row[0]
+
+    def put(self, key: str, response: str, prompt_version: str = PROMPT_VERSION, model: str = None):
+        now = time.time()
+        with self._lock:
+            with self.conn:
+                self.conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                                  (key, prompt_version, model, response, now, now))
+            self._puts += 1
+            if self._puts % EVICT_EVERY == 0:
+                self._evict()
+
+    def _evict(self):
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                " SELECT key FROM responses ORDER BY last_used_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,))
+
+    def invalidate(self, prompt_version: str = None) -> int:
+        """Delete entries for one prompt version (or everything when None). Returns rows deleted."""
+        with self._lock, self.conn:
+            if prompt_version is None:
+                cursor = self.conn.execute("DELETE FROM responses")
+            else:
+                cursor = self.conn.execute("DELETE FROM responses WHERE prompt_version = ?", (prompt_version,))
+            return cursor.rowcount
+
+    def size(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_cache() -> LLMCache:
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = LLMCache()
+        return _default_cache
+
+
+def cached_chat_completion(client, prompt_version: str = PROMPT_VERSION, **params) -> str:
+    """
+    Return the message content for client.chat.completions.create(**params), serving
+    repeated requests from the persistent cache. Misses go through the shared rate limiter.
+    API errors propagate and are not cached.
+    """
+    cache = get_cache()
+    key = request_key(params, prompt_version)
+    cached = cache.get(key)
+    if cached is not None:
+        instrumentation.count("llm_cache_hits")
+        return cached
+    response = rate_limited_completion(client, **params)
+    content = response.choices[0].message.content
+    if content is not None:
+        cache.put(key, content, prompt_version, params.get("model"))
+    return content
+
+
+def print_stats():
+    cache = get_cache()
+    total = cache.hits + cache.misses
+    rate = (cache.hits / total * 100) if total else 0.0
+    print(f"LLM cache: {cache.hits} hit(s), {cache.misses} miss(es) ({rate:.0f}% hit rate), {cache.size()} entries stored.")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect or invalidate the persistent LLM response cache")
+    parser.add_argument("--invalidate", metavar="PROMPT_VERSION", help="Delete cached responses for this prompt version")
+    parser.add_argument("--clear", action="store_true", help="Delete every cached response")
+    args = parser.parse_args()
+
+    cache = LLMCache()
+    if args.clear:
+        print(f"Deleted {cache.invalidate()} cached responses.")
+    elif args.invalidate:
+        print(f"Deleted {cache.invalidate(args.invalidate)} cached responses for prompt version {args.invalidate}.")
+    print(f"{cache.size()} cached responses in {CACHE_PATH}.")
@@ -0,0 +1,112 @@
+import asyncio
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import openai
+
+import instrumentation
+
+# Budgets shared by every chat completion in the process (set them to your account's limits).
+REQUESTS_PER_MINUTE = int(os.getenv("LLM_REQUESTS_PER_MINUTE", 500))
+TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", 200_000))
+# How many LLM requests may be in flight at once.
+MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 16))
+
+MAX_RETRIES = 6
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+
+
+class TokenBucket:
+    """Thread-safe bucket refilled continuously at capacity per minute."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1.0):
+        # A single request larger than the whole bucket is allowed through once it is full.
+        amount = min(amount, self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait = (amount - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+_request_bucket = TokenBucket(REQUESTS_PER_MINUTE)
+_token_bucket = TokenBucket(TOKENS_PER_MINUTE)
+
+
+def estimate_request_tokens(params: dict) -> int:
+    """Rough prompt + completion token count for budgeting (~4 characters per token)."""
+    prompt_chars = sum(len(str(m.get("content", ""))) for m in params.get("messages", []))
+    return prompt_chars // 4 + params.get("max_tokens", 0)
+
+
+def _retry_after_seconds(error) -> float:
+    response = getattr(error, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+def rate_limited_completion(client, **params):
+    """
+    client.chat.completions.create(**params) under the shared requests/tokens-per-minute
+    budgets, retrying 429s with jittered exponential backoff (or the server's Retry-After).
+    """
+    for attempt in range(MAX_RETRIES + 1):
+        _request_bucket.acquire()
+        _token_bucket.acquire(estimate_request_tokens(params))
+        try:
+            with instrumentation.timed("llm_request"):
+                response = client.chat.completions.create(**params)
+            instrumentation.count("llm_api_calls")
+            usage = getattr(response, "usage", None)
+            if usage is not None:
+                instrumentation.count("llm_prompt_tokens", usage.prompt_tokens)
+                instrumentation.count("llm_completion_tokens", usage.completion_tokens)
+            return response
+        except openai.RateLimitError as e:
+            if attempt == MAX_RETRIES:
+                raise
+            delay = _retry_after_seconds(e) or random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+            instrumentation.count("llm_rate_limited")
+            print(f"Rate limited by the LLM API; retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
+async def _map_async(fn, items, max_concurrency):
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(max_concurrency)
+    with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+        async def run(item):
+            async with semaphore:
+                return await loop.run_in_executor(pool, fn, item)
+
+        return await asyncio.gather(*(run(item) for item in items))
+
+
+def map_concurrently(fn, items, max_concurrency: int = MAX_CONCURRENCY) -> list:
+    """
+    Apply a blocking LLM step fn to every item with up to max_concurrency calls in flight.
+    Results are returned in input order. Rate limits are enforced by rate_limited_completion.
+    """
+    items = list(items)
+    if not items:
+        return []
+    return asyncio.run(_map_async(fn, items, max_concurrency))
@@ -0,0 +1,72 @@
+import os
+
+import numpy as np
+
+# ----------------------------
+# Reduced-Precision Embeddings
+# ----------------------------
+# ada-002 vectors are 1536 floats; stored or sent at full precision they dominate artifact
+# and upload size. Supported precisions:
+#   float32: as returned by the API (the default; uploads stay plain JSON float lists)
+#   float16: half the bytes; uploads fit a pgvector halfvec(1536) column
+#   int8:    a quarter of the bytes plus one float32 scale per vector (symmetric scalar
+#            quantization: code = round(x / scale), scale = max|x| / 127)
+PRECISIONS = ("float32", "float16", "int8")
+EMBEDDING_PRECISION = os.getenv("EMBEDDING_PRECISION", "float32")
+if EMBEDDING_PRECISION not in PRECISIONS:
+    raise ValueError(f"EMBEDDING_PRECISION must be one of {', '.join(PRECISIONS)}")
+
+# Significant digits written per value in uploads; enough to carry everything the
+# precision keeps, so the text is as short as it can be without losing more.
+UPLOAD_DIGITS = {"float16": 4, "int8": 3}
+
+
+def quantize(vectors, precision: str = EMBEDDING_PRECISION):
+    """
+    Encode a (n, dim) batch of vectors. Returns (codes, scales): codes in the precision's
+    dtype and one float32 scale per vector (all 1.0 unless precision is int8).
+    """
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    scales = np.ones(len(vectors), dtype=np.float32)
+    if precision == "float32":
+        return vectors, scales
+    if precision == "float16":
+        return vectors.astype(np.float16), scales
+    if precision == "int8":
+        peaks = np.abs(vectors).max(axis=1)
+        scales = np.where(peaks > 0, peaks / 127, 1.0).astype(np.float32)
+        codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+        return codes, scales
+    raise ValueError(f"Unknown embedding precision {precision!r}; expected one of {', '.join(PRECISIONS)}")
+
+
+def dequantize(codes, scales) -> np.ndarray:
+    """Decode quantize() output back to a float32 (n, dim) matrix."""
+    codes = np.asarray(codes)
+    vectors = codes.astype(np.float32)
+    if codes.dtype == np.int8:
+        vectors *= np.asarray(scales, dtype=np.float32)[:, None]
+    return vectors
+
+
+def round_trip(vectors, precision: str = EMBEDDING_PRECISION) -> np.ndarray:
+    """The float32 vectors a reader gets back after storing these at the given precision."""
+    return dequantize(*quantize(vectors, precision))
+
+
+def format_for_upload(vector, precision: str = EMBEDDING_PRECISION):
+    """
+    Embedding value for an upload row. float32 keeps the plain list of floats; reduced
+    precisions are sent as a compact pgvector text literal ("[0.0123,-0.00456,...]") of the
+    round-tripped values, which pgvector parses the same way as a JSON array.
+    """
+    if precision == "float32":
+        return vector
+    digits = UPLOAD_DIGITS[precision]
+    values = round_trip(vector, precision)[0]
+    return "[" + ",".join(f"{value:.{digits}g}" for value in values.tolist()) + "]"
+
+
+def bytes_per_vector(dim: int, precision: str) -> int:
+    """Storage for one vector's codes plus its scale (int8 only)."""
+    return dim * np.dtype(precision).itemsize + (4 if precision == "int8" else 0)
@@ -1,14 +1,22 @@
-import requests
 from bs4 import BeautifulSoup
 import re
-import csv
-import time
+import dataset_io
 from multiprocessing import Pool, cpu_count
-from functools import lru_cache
 from openai import OpenAI
 import os
 from typing import Optional
 from dotenv import load_dotenv
+from fetch_engine import get_soup, get_soups, iter_soups
+from html_parsing import LINKS_ONLY, scan_page
+from checkpoint import CheckpointJournal
+from llm_cache import cached_chat_completion, print_stats as print_llm_cache_stats
+from llm_executor import map_concurrently
+from keyword_matcher import get_matcher
+from text_cleaning import clean_text
+import instrumentation
+from token_budget import SUMMARY_INPUT_TOKENS, print_stats as print_token_stats, reduce_to_budget, truncate_to_budget
+from structured_extraction import FUSED_EXTRACTION, extract_summary_and_area
+from area_classifier import get_classifier, use_embeddings
 
 # Load environment variables from .env file
 load_dotenv()
@@ -81,42 +89,17 @@ SUBDOMAIN_LINKS = {
 # ----------------------------
 # Data Cleaning Functions
 # ----------------------------
-def clean_text(text: str) -> str:
-    """Remove non-printable characters and extra whitespace."""
-    if not text:
-        return ""
-    text = ''.join(ch for ch in text if ch.isprintable())
-    text = re.sub(r'\s+', ' ', text)
-    return text.strip()
-
-def clean_list(lst):
-    """Clean each string in a list."""
-    return [clean_text(item) for item in lst if clean_text(item)]
-
 def simple_match_keywords(text: str, keywords) -> list:
-    """Return all matches from 'keywords' that appear in 'text' (case-insensitive)."""
-    text_lower = text.lower()
-    found = []
-    for kw in keywords:
-        if kw.lower() in text_lower:
-            found.append(kw)
-    return list(set(found))
+    """
+    Return the keywords found in text as whole words (case-insensitive). Each keyword is
+    first looked for with a plain substring scan of the lowercased text; only the hits
+    are then checked for word boundaries with that keyword's precompiled regex.
+    """
+    return get_matcher(keywords).find_all(text)
 
 # ----------------------------
 # Helper Functions for Extraction
 # ----------------------------
-def get_soup(url):
-    """Fetch URL content and return a BeautifulSoup object."""
-    try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
-        soup.base_url = url
-        return soup
-    except Exception as e:
-        print(f"Error fetching {url}: {e}")
-        return None
-
 def extract_professor_profile_links(soup):
     """Extract all professor profile links from the main faculty page."""
     links = []
@@ -128,6 +111,17 @@ def extract_professor_profile_links(soup):
             links.append(href)
     return list(set(links))
 
+# Labels searched for in a profile's strings, and the tags collected, in one walk of the page.
+DETAIL_PATTERNS = {
+    "email": re.compile(r'[\w\.-]+@[\w\.-]+'),
+    "preferred_majors": re.compile(r'Preferred\s+Majors:', re.IGNORECASE),
+    "looking_for": re.compile(r'(seeking|looking for|accepting)\s+(students|researchers)', re.IGNORECASE),
+}
+DETAIL_TAGS = {"header": ("h1", "h2"), "paragraphs": ("p",)}
+# A literal every match contains: strings without it skip that (much slower) regex search.
+DETAIL_GUARDS = {"email": "@", "preferred_majors": ":"}
+
+@instrumentation.instrumented("extract")
 def extract_details_from_page(soup):
     """Extract professor details from a page."""
     details = {
@@ -142,22 +136,26 @@ def extract_details_from_page(soup):
         "research_subdomain": "Not found"
     }
     
-    full_text = clean_text(soup.get_text(separator=" ", strip=True))
+    scan = scan_page(soup, DETAIL_PATTERNS, DETAIL_TAGS, DETAIL_GUARDS)
+    found = scan["strings"]
+    full_text = clean_text(scan["text"])
     
     # Name
-    header = soup.find(["h1", "h2"])
+    header = scan["tags"]["header"][0] if scan["tags"]["header"] else None
     if header:
         name_raw = clean_text(header.get_text())
         details["name"] = name_raw.title()
     
     # Email
-    email_match = soup.find_all(string=re.compile(r'[\w\.-]+@[\w\.-]+'))
-    if email_match:
-        details["email"] = clean_text(email_match[0])
+    if found["email"]:
+        details["email"] = clean_text(found["email"])
     
     # Research Description
-    paragraphs = soup.find_all("p")
-    research_paras = [p.get_text(separator=" ") for p in paragraphs if ("research" in p.get_text().lower() or "interest" in p.get_text().lower() or "publication" in p.get_text().lower())]
+    research_paras = []
+    for p in scan["tags"]["paragraphs"]:
+        p_lower = p.get_text().lower()
+        if "research" in p_lower or "interest" in p_lower or "publication" in p_lower:
+            research_paras.append(p.get_text(separator=" "))
     if research_paras:
         combined = " ".join(research_paras)
     else:
@@ -170,10 +168,10 @@ def extract_details_from_page(soup):
     details["research_areas"] = found_areas
     
     # Preferred Majors
-    majors_block = soup.find(text=re.compile(r'Preferred\s+Majors:', re.IGNORECASE))
+    majors_block = found["preferred_majors"]
     if majors_block:
         parent = majors_block.parent
-        text = re.sub(r'Preferred\s+Majors:', '', parent.get_text(separator=" ", strip=True), flags=re.IGNORECASE)
+        text = DETAIL_PATTERNS["preferred_majors"].sub('', parent.get_text(separator=" ", strip=True))
         pm = [clean_text(m) for m in re.split(r'[;,]', text) if m.strip()]
         details["preferred_majors"] = pm[:3]
     else:
@@ -186,7 +184,7 @@ def extract_details_from_page(soup):
         details["preferred_majors"] = derived_majors[:3]
     
     # Currently Looking For
-    looking_tag = soup.find(text=re.compile(r'(seeking|looking for|accepting)\s+(students|researchers)', re.IGNORECASE))
+    looking_tag = found["looking_for"]
     if looking_tag:
         details["currently_looking_for"] = clean_text(looking_tag)
     
@@ -214,10 +212,11 @@ def normalize_name_for_match(name: str) -> str:
 def assign_subdomains(professors):
     """Assign research subdomains to professors based on subdomain pages."""
     subdomain_map = {}
+    subdomain_soups = get_soups(SUBDOMAIN_LINKS.values())
     
     for subdomain_name, url in SUBDOMAIN_LINKS.items():
         print(f"\nParsing subdomain page for {subdomain_name}: {url}")
-        soup = get_soup(url)
+        soup = subdomain_soups.get(url)
         if not soup:
             print(f"Failed to fetch subdomain page: {url}")
             continue
@@ -244,7 +243,6 @@ def assign_subdomains(professors):
                 print(f"Found professor: {raw_name} -> {norm_name}")
             current_li = current_li.find_next_sibling("li")
         print(f"Total professors found in {subdomain_name}: {professor_count}")
-        time.sleep(1)
     
     # Assign research_subdomain to each professor
     print("\nAssigning subdomains to professors...")
@@ -260,13 +258,15 @@ def assign_subdomains(professors):
     
     return professors
 
-@lru_cache(maxsize=1000)
 def cached_summarize(text: str, max_length: int = 250, min_length: int = 150) -> str:
-    """Cached summarization using OpenAI's ChatCompletion API."""
+    """Summarization using OpenAI's ChatCompletion API, cached across runs in the persistent LLM cache."""
     if not text or len(text.split()) < 30:
         return text
+    # Over-budget text is summarized chunk by chunk and the partial summaries summarized below.
+    text = reduce_to_budget(text, cached_summarize)
     try:
-        response = client.chat.completions.create(
+        content = cached_chat_completion(
+            client,
             model="gpt-4.1-nano",
             messages=[{
                 "role": "system", "content": "You are a helpful assistant that creates concise, 3-5 sentence summaries of academic text.",
@@ -278,65 +278,62 @@ def cached_summarize(text: str, max_length: int = 250, min_length: int = 150) ->
             presence_penalty=0.1,
             frequency_penalty=0.1
         )
-        return clean_text(response.choices[0].message.content)
+        return clean_text(content)
     except Exception as e:
         print(f"Summarization error: {e}")
         return text
 
+@instrumentation.instrumented("summarize")
+def summarize_professor(prof):
+    """Summarize one professor's research description."""
+    raw_desc = prof.get("research_description", "")
+    if raw_desc and len(raw_desc.split()) >= 30:
+        prof["research_description"] = cached_summarize(raw_desc)
+        print(f"Summarized research description for {prof.get('name', 'N/A')}")
+    return prof
+
 def perform_summarization_on_professors(professors):
     """Summarize research descriptions and academic backgrounds."""
-    for prof in professors:
-        raw_desc = prof.get("research_description", "")
-        if raw_desc and len(raw_desc.split()) >= 30:
-            prof["research_description"] = cached_summarize(raw_desc)
-            print(f"Summarized research description for {prof.get('name', 'N/A')}")
+    map_concurrently(summarize_professor, professors)
     return professors
 
-def scrape_biology_professors():
-    """Main scraping function for biology professors."""
-    all_professors = []
-    
+def iter_biology_professors(skip_links=()):
+    """Yield biology professor details as each profile page arrives, skipping profiles in skip_links."""
     # Get main faculty page
     main_url = "https://www.bio.purdue.edu/People/faculty/index.html"
     print(f"Scraping main faculty list at {main_url}...")
-    main_soup = get_soup(main_url)
+    main_soup = get_soup(main_url, parse_only=LINKS_ONLY)
     if not main_soup:
-        return []
+        return
     
     # Get all professor profile links
     prof_links = extract_professor_profile_links(main_soup)
     print(f"Found {len(prof_links)} professor profile links.")
+    prof_links = [link for link in prof_links if link not in skip_links]
     
-    # Scrape each professor's details
-    for link in prof_links:
+    # Scrape each professor's details (fetched concurrently, rate limited per host)
+    for link, profile_soup in iter_soups(prof_links):
         print(f"Scraping professor page: {link}")
-        profile_soup = get_soup(link)
         if not profile_soup:
             continue
         details = extract_details_from_page(profile_soup)
         details["profile_link"] = link
-        all_professors.append(details)
-        time.sleep(1)
-    
-    return all_professors
+        yield details
 
-def save_to_csv(professors_data, filename='biology_professors_dataset.csv'):
-    """Save professor data to CSV file."""
-    data_dir = os.path.join(os.path.dirname(__file__), 'data')
-    os.makedirs(data_dir, exist_ok=True)
-    
-    filepath = os.path.join(data_dir, filename)
-    with open(filepath, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=professors_data[0].keys())
-        writer.writeheader()
-        writer.writerows(professors_data)
-    
-    print(f"Saved {len(professors_data)} professors to {filepath}")
+def scrape_biology_professors():
+    """Main scraping function for biology professors."""
+    return list(iter_biology_professors())
+
+def save_dataset(professors_data, name='biology_professors_dataset'):
+    """Save professor data as data/<name>.parquet (plus a CSV export)."""
+    return dataset_io.save_dataset(professors_data, name)
 
+@instrumentation.instrumented("classify")
 def classify_research_area(description: str) -> str:
     """Classify a research description into one of the known research areas using GPT-4o-mini."""
     if not description or len(description.split()) < 10:
         return "Not found"
+    description = truncate_to_budget(description, SUMMARY_INPUT_TOKENS)
     prompt = (
         f"Below is a research description. Choose exactly one research area from the following list: "
         f"{', '.join(KNOWN_RESEARCH_AREAS_BIO)}.\n\n"
@@ -344,7 +341,8 @@ def classify_research_area(description: str) -> str:
         "Your answer should be ONLY the exact name of one research area from the list."
     )
     try:
-        response = client.chat.completions.create(
+        content = cached_chat_completion(
+            client,
             model="gpt-4.1-nano",
             messages=[
                 {"role": "system", "content": "You are a strict classification assistant."},
@@ -353,7 +351,7 @@ def classify_research_area(description: str) -> str:
             max_tokens=40,  # slightly increased token limit
             temperature=0.0,
         )
-        area = response.choices[0].message.content.strip()
+        area = content.strip()
         print("Raw classification response:", area)  # For debugging
         
         # Remove quotes and extra whitespace
@@ -370,58 +368,114 @@ def classify_research_area(description: str) -> str:
 
 
 
+def classify_professor(prof):
+    """Assign a research subdomain to one professor using the classification model."""
+    description = prof.get("research_description", "")
+    if use_embeddings():
+        classified_area = get_classifier(KNOWN_RESEARCH_AREAS_BIO).classify_many(
+            [description], fallback=classify_research_area)[0]
+    else:
+        classified_area = classify_research_area(description)
+    prof["research_subdomain"] = classified_area
+    print(f"Classified {prof.get('name', 'N/A')} as: {classified_area}")
+    return prof
+
+def classify_professors_by_embedding(professors):
+    """Assign every professor's subdomain in one batch by embedding similarity (LLM only for close calls)."""
+    descriptions = [prof.get("research_description", "") for prof in professors]
+    areas = get_classifier(KNOWN_RESEARCH_AREAS_BIO).classify_many(descriptions, fallback=classify_research_area)
+    for prof, area in zip(professors, areas):
+        prof["research_subdomain"] = area
+    print(f"Classified {len(professors)} professors by embedding similarity.")
+    return professors
+
 def assign_subdomains_via_classification(professors):
     """Assign research subdomains to each professor using a classification model."""
     print("\nAssigning research subdomains via classification...")
-    for prof in professors:
-        description = prof.get("research_description", "")
-        classified_area = classify_research_area(description)
-        prof["research_subdomain"] = classified_area
-        print(f"Classified {prof.get('name', 'N/A')} as: {classified_area}")
+    if use_embeddings():
+        return classify_professors_by_embedding(professors)
+    map_concurrently(classify_professor, professors)
     return professors
 
-def run_biology_pipeline():
-    """Run the full scraping, summarization, and classification pipeline."""
+def extract_professor(prof):
+    """
+    Summarize and classify one professor with a single structured LLM call, constrained to
+    KNOWN_RESEARCH_AREAS_BIO. Falls back to separate summarize/classify calls on failure.
+    """
+    raw_desc = prof.get("research_description", "")
+    result = extract_summary_and_area(
+        client, raw_desc, KNOWN_RESEARCH_AREAS_BIO,
+        "Please provide a concise summary in 3-5 sentences for the following text."
+    )
+    if result is None:
+        return classify_professor(summarize_professor(prof))
+    if result["summary"]:
+        prof["research_description"] = clean_text(result["summary"])
+        print(f"Summarized research description for {prof.get('name', 'N/A')}")
+    prof["research_subdomain"] = result["research_area"]
+    print(f"Classified {prof.get('name', 'N/A')} as: {result['research_area']}")
+    return prof
+
+def process_biology_professor(prof):
+    """Summarize and classify a single scraped professor (the per-record form of run_biology_pipeline)."""
+    if FUSED_EXTRACTION and not use_embeddings():
+        return extract_professor(prof)
+    return classify_professor(summarize_professor(prof))
+
+def biology_checkpoint_key(prof):
+    return prof.get("profile_link")
+
+def run_biology_pipeline(resume=False):
+    """
+    Run the full scraping, summarization, and classification pipeline.
+    Every professor is journaled as it finishes each stage; with resume=True, work
+    already recorded in the checkpoint journal is reused instead of redone.
+    """
     print("Running full biology professor scraping pipeline...")
+    journal = CheckpointJournal("biology", resume=resume)
     
-    professors = scrape_biology_professors()
+    professors = journal.records("scraped")
+    for prof in iter_biology_professors(skip_links=journal.keys("scraped")):
+        professors.append(journal.append("scraped", biology_checkpoint_key(prof), prof))
     if not professors:
         print("No professors scraped. Exiting biology pipeline.")
         return []
 
-    print("Summarizing research descriptions...")
-    professors = perform_summarization_on_professors(professors)
+    if use_embeddings():
+        print("Summarizing research descriptions...")
+        professors = journal.process("summarized", professors, summarize_professor, biology_checkpoint_key, map_fn=map_concurrently)
 
-    print("Classifying research subdomains...")
-    professors = assign_subdomains_via_classification(professors)
+        print("Classifying research subdomains by embedding similarity...")
+        professors = classify_professors_by_embedding(professors)
+    elif FUSED_EXTRACTION:
+        print("Summarizing and classifying research descriptions (one call per professor)...")
+        professors = journal.process("extracted", professors, extract_professor, biology_checkpoint_key, map_fn=map_concurrently)
+    else:
+        print("Summarizing research descriptions...")
+        professors = journal.process("summarized", professors, summarize_professor, biology_checkpoint_key, map_fn=map_concurrently)
 
-    save_to_csv(professors)
+        print("Classifying research subdomains...")
+        professors = journal.process("classified", professors, classify_professor, biology_checkpoint_key, map_fn=map_concurrently)
+
+    save_dataset(professors)
     print("Biology professor data saved.")
+    print_llm_cache_stats()
+    print_token_stats()
 
     return professors
 
-def main():
+def main(resume=False):
     # Test the OpenAI endpoint before starting
     print("Testing OpenAI endpoint with model '4o-mini'...")
     test_openai_api()
     
-    print("Starting comprehensive Biology professor scraping...")
-    professors = scrape_biology_professors()
-    print(f"Finished web scraping. Total professors scraped: {len(professors)}\n")
-    
-    # Skip the original subdomain parsing
-    # print("Assigning research subdomains...")
-    # professors = assign_subdomains(professors)
-    
-    print("Starting summarization tasks for research descriptions...")
-    professors = perform_summarization_on_professors(professors)
-    
-    print("Assigning research subdomains via classification...")
-    professors = assign_subdomains_via_classification(professors)
-    
-    # Save the data to CSV with the new subdomains
-    save_to_csv(professors)
-    print("Biology professors dataset saved as scripts/data/biology_professors_dataset.csv.")
+    # Skip the original subdomain parsing (assign_subdomains); subdomains come from classification.
+    run_biology_pipeline(resume=resume)
+    print("Biology professors dataset saved as scripts/data/biology_professors_dataset.parquet (CSV export alongside).")
 
 if __name__ == "__main__":
-    main()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Scrape Biology professor data")
+    parser.add_argument("--resume", action="store_true", help="Reuse work recorded in the checkpoint journal")
+    main(resume=parser.parse_args().resume)
@@ -1,15 +1,20 @@
-import requests
 from bs4 import BeautifulSoup
 import re
-import csv
-import time
-from multiprocessing import Pool, cpu_count
-from functools import lru_cache
+import dataset_io
 from openai import OpenAI
 import os
 from typing import Optional
 from dotenv import load_dotenv
 import json
+from fetch_engine import get_soups, iter_pages
+from html_parsing import LINKS_ONLY, extraction_pool, map_pages, parse_html, scan_page
+from checkpoint import CheckpointJournal
+from llm_cache import cached_chat_completion, print_stats as print_llm_cache_stats
+from llm_executor import map_concurrently
+from keyword_matcher import get_matcher
+import text_cleaning
+import instrumentation
+from token_budget import print_stats as print_token_stats, reduce_to_budget
 
 # Load environment variables from .env file
 load_dotenv()
@@ -94,40 +99,28 @@ subtopic_links = {
     "Theory of Computing, Algorithms, and Quantum Computing": "https://www.cs.purdue.edu/research/theory-computing-algorithms-quantum.html"
 }
 
+# A professor listed under several subdomains gets one record with all of them, joined
+# with this (the subdomain names themselves contain commas).
+SUBDOMAIN_SEPARATOR = "; "
+
 # ----------------------------
 # Data Cleaning Functions
 # ----------------------------
-def remove_artifacts(text):
-    """
-    Remove unwanted PDF or binary artifacts from the text.
-    For example, remove strings that include "endobj" or "obj<</D".
-    """
-    # Remove typical PDF artifacts using regex.
-    text = re.sub(r'>>?endobj.*?obj<</D.*?>>', '', text, flags=re.DOTALL)
-    # Remove any lines containing "endobj" or "obj<</D"
-    lines = text.splitlines()
-    lines = [line for line in lines if "endobj" not in line.lower() and "obj<</d" not in line.lower()]
-    return "\n".join(lines)
-
 def clean_text(text):
     """Remove non-printable characters, artifacts, and extra whitespace."""
-    text = ''.join(ch for ch in text if ch.isprintable())
-    text = remove_artifacts(text)
-    text = re.sub(r'\s+', ' ', text)
-    return text.strip()
+    return text_cleaning.clean_text(text, artifacts=True)
 
 def clean_list(lst):
     """Clean each string in a list."""
-    return [clean_text(item) for item in lst if clean_text(item)]
+    return text_cleaning.clean_list(lst, artifacts=True)
 
 def simple_match_keywords(text, keywords):
-    """Return a list of keywords (from keywords) found in text (case-insensitive)."""
-    matches = []
-    text_lower = text.lower()
-    for kw in keywords:
-        if kw.lower() in text_lower:
-            matches.append(kw)
-    return list(set(matches))
+    """
+    Return the keywords found in text as whole words (case-insensitive). Each keyword is
+    first looked for with a plain substring scan of the lowercased text; only the hits
+    are then checked for word boundaries with that keyword's precompiled regex.
+    """
+    return get_matcher(keywords).find_all(text)
 
 def lightweight_summarize(text, num_sentences=3):
     """
@@ -140,16 +133,19 @@ def lightweight_summarize(text, num_sentences=3):
     else:
         return " ".join(sentences[:num_sentences])
 
-@lru_cache(maxsize=1000)
 def cached_summarize(text: str, max_length: int = 250, min_length: int = 150) -> str:
     """
     Cached summarization using OpenAI's ChatCompletion API with model "4o-mini".
+    Responses are kept in the persistent LLM cache, so unchanged text is never re-summarized across runs.
     This function uses the "4o-mini" model to generate a concise summary in 3-5 sentences.
     """
     if not text or len(text.split()) < 30:
         return text
+    # Over-budget text is summarized chunk by chunk and the partial summaries summarized below.
+    text = reduce_to_budget(text, cached_summarize)
     try:
-        response = client.chat.completions.create(
+        content = cached_chat_completion(
+            client,
             model="gpt-4.1-nano",  # using "4o-mini" as requested; ensure this model is available
             messages=[{
                 "role": "system", "content": "You are a helpful assistant that creates concise, 3-5 sentence summaries of academic text.",
@@ -161,7 +157,7 @@ def cached_summarize(text: str, max_length: int = 250, min_length: int = 150) ->
             presence_penalty=0.1,
             frequency_penalty=0.1
         )
-        return clean_text(response.choices[0].message.content)
+        return clean_text(content)
     except Exception as e:
         print(f"Summarization error: {e}")
         return text
@@ -169,18 +165,6 @@ def cached_summarize(text: str, max_length: int = 250, min_length: int = 150) ->
 # ----------------------------
 # Helper Functions for Extraction
 # ----------------------------
-def get_soup(url):
-    """Fetch URL content and return a BeautifulSoup object with base_url attribute."""
-    try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
-        soup.base_url = url
-        return soup
-    except Exception as e:
-        print(f"Error fetching {url}: {e}")
-        return None
-
 def extract_professor_profile_links(soup):
     """
     From a faculty listing page, extract all professor profile links (those with '/people/faculty/').
@@ -206,6 +190,26 @@ def get_professor_homepage_link(soup):
             return href
     return None
 
+# Labels searched for in a profile's strings, and the tags collected, in one walk of the page.
+DETAIL_PATTERNS = {
+    "email": re.compile(r'[\w\.-]+@[\w\.-]+'),
+    "department": re.compile(r'Department:', re.IGNORECASE),
+    "classes": re.compile(r'(Courses|Classes|Teaching):', re.IGNORECASE),
+    "research_areas": re.compile(r'(Research Interests|Research Areas):', re.IGNORECASE),
+    "preferred_majors": re.compile(r'Preferred Majors:', re.IGNORECASE),
+    "research_description": re.compile(r'(Publications|Past Papers|Research Description):', re.IGNORECASE),
+    "academic_background": re.compile(r'(Education|Academic Background):', re.IGNORECASE),
+    "looking_for": re.compile(r'(seeking|looking for|accepting)\s+(undergraduate|grad|postgrad|researchers)', re.IGNORECASE),
+}
+DETAIL_TAGS = {"header": ("h1", "h2"), "paragraphs": ("p",)}
+# A literal every match contains: strings without it skip that (much slower) regex search.
+DETAIL_GUARDS = {"email": "@", "department": ":", "classes": ":", "research_areas": ":", "preferred_majors": ":",
+                 "research_description": ":", "academic_background": ":"}
+
+def labeled_text(tag, label):
+    """Text of the element containing a label string, with the label itself removed."""
+    return DETAIL_PATTERNS[label].sub('', tag.parent.get_text(separator=" ", strip=True))
+
 def extract_details_from_page(soup):
     """
     Extract professor details from a page.
@@ -215,19 +219,20 @@ def extract_details_from_page(soup):
       currently_looking_for
     """
     details = {}
-    full_text = clean_text(soup.get_text(separator=" ", strip=True))
+    scan = scan_page(soup, DETAIL_PATTERNS, DETAIL_TAGS, DETAIL_GUARDS)
+    found = scan["strings"]
+    full_text = clean_text(scan["text"])
     
     # Name
-    header = soup.find(['h1', 'h2'])
+    header = scan["tags"]["header"][0] if scan["tags"]["header"] else None
     details["name"] = clean_text(header.get_text()) if header else "N/A"
     
     # Email
-    emails = soup.find_all(string=re.compile(r'[\w\.-]+@[\w\.-]+'))
-    details["email"] = clean_text(emails[0]) if emails else "N/A"
+    details["email"] = clean_text(found["email"]) if found["email"] else "N/A"
     
     # Department
     dept = "N/A"
-    dept_tag = soup.find(string=re.compile(r'Department:', re.IGNORECASE))
+    dept_tag = found["department"]
     if dept_tag:
         parts = dept_tag.split("Department:")
         if len(parts) > 1:
@@ -241,64 +246,58 @@ def extract_details_from_page(soup):
     
     # Classes Teaching
     classes = []
-    classes_tag = soup.find(string=re.compile(r'(Courses|Classes|Teaching):', re.IGNORECASE))
-    if classes_tag:
-        parent = classes_tag.parent
-        text = re.sub(r'(Courses|Classes|Teaching):', '', parent.get_text(separator=" ", strip=True), flags=re.IGNORECASE)
-        classes = [clean_text(c) for c in re.split(r'[;,]', text) if c.strip()]
+    if found["classes"]:
+        text = labeled_text(found["classes"], "classes")
+        classes = [c for c in re.split(r'[;,]', text) if c.strip()]
     if not classes:
         course_matches = re.findall(r'CS\s*\d{3,5}', full_text)
-        classes = list(set(course_matches))
+        classes = list(dict.fromkeys(course_matches))
     details["classes_teaching"] = clean_list(classes)
     
     # Research Areas
     research_areas = []
-    research_tag = soup.find(string=re.compile(r'(Research Interests|Research Areas):', re.IGNORECASE))
-    if research_tag:
-        parent = research_tag.parent
-        text = re.sub(r'(Research Interests|Research Areas):', '', parent.get_text(separator=" ", strip=True), flags=re.IGNORECASE)
-        research_areas = [clean_text(r) for r in re.split(r'[;,]', text) if r.strip()]
+    if found["research_areas"]:
+        text = labeled_text(found["research_areas"], "research_areas")
+        research_areas = [r for r in re.split(r'[;,]', text) if r.strip()]
     if not research_areas:
         research_areas = simple_match_keywords(full_text, KNOWN_RESEARCH_AREAS)
     details["research_areas"] = clean_list(research_areas)
     
     # Preferred Majors
     preferred_majors = []
-    majors_tag = soup.find(string=re.compile(r'Preferred Majors:', re.IGNORECASE))
-    if majors_tag:
-        parent = majors_tag.parent
-        text = re.sub(r'Preferred Majors:', '', parent.get_text(separator=" ", strip=True), flags=re.IGNORECASE)
-        preferred_majors = [clean_text(m) for m in re.split(r'[;,]', text) if m.strip()]
+    if found["preferred_majors"]:
+        text = labeled_text(found["preferred_majors"], "preferred_majors")
+        preferred_majors = [m for m in re.split(r'[;,]', text) if m.strip()]
     if not preferred_majors:
         preferred_majors = simple_match_keywords(full_text, KNOWN_PREFERRED_MAJORS)
     details["preferred_majors"] = clean_list(preferred_majors)
     
     # Research Description – explicit extraction; fallback to paragraphs mentioning "research"
     research_desc = ""
-    research_desc_tag = soup.find(string=re.compile(r'(Publications|Past Papers|Research Description):', re.IGNORECASE))
-    if research_desc_tag:
-        parent = research_desc_tag.parent
-        research_desc = re.sub(r'(Publications|Past Papers|Research Description):', '', parent.get_text(separator=" ", strip=True), flags=re.IGNORECASE)
+    if found["research_description"]:
+        research_desc = labeled_text(found["research_description"], "research_description")
     if not research_desc:
-        paragraphs = soup.find_all("p")
-        candidate_texts = [clean_text(p.get_text(separator=" ", strip=True)) for p in paragraphs if ("research" in p.get_text().lower() or "interest" in p.get_text().lower() or "publication" in p.get_text().lower())]
+        candidate_texts = []
+        for p in scan["tags"]["paragraphs"]:
+            p_lower = p.get_text().lower()
+            if "research" in p_lower or "interest" in p_lower or "publication" in p_lower:
+                candidate_texts.append(clean_text(p.get_text(separator=" ", strip=True)))
+                if len(candidate_texts) == 3:
+                    break
         if candidate_texts:
-            research_desc = " ".join(candidate_texts[:3])
+            research_desc = " ".join(candidate_texts)
     details["research_description"] = clean_text(research_desc)
     
     # Academic Background – similar extraction
     academic_bg = ""
-    edu_tag = soup.find(string=re.compile(r'(Education|Academic Background):', re.IGNORECASE))
-    if edu_tag:
-        parent = edu_tag.parent
-        academic_bg = re.sub(r'(Education|Academic Background):', '', parent.get_text(separator=" ", strip=True), flags=re.IGNORECASE)
+    if found["academic_background"]:
+        academic_bg = labeled_text(found["academic_background"], "academic_background")
     details["academic_background"] = clean_text(academic_bg)
     
     # Currently Looking For
     looking_for = ""
-    looking_tag = soup.find(string=re.compile(r'(seeking|looking for|accepting)\s+(undergraduate|grad|postgrad|researchers)', re.IGNORECASE))
-    if looking_tag:
-        looking_for = clean_text(looking_tag)
+    if found["looking_for"]:
+        looking_for = clean_text(found["looking_for"])
     details["currently_looking_for"] = looking_for if looking_for else "Not specified"
     
     return details
@@ -315,7 +314,10 @@ def merge_details(profile_details, home_details):
         val1 = profile_details.get(k, "")
         val2 = home_details.get(k, "")
         if isinstance(val1, list) or isinstance(val2, list):
-            merged[k] = list(set(val1) | set(val2))
+            # Ordered de-duplication: a set's order changes with PYTHONHASHSEED, which would
+            # make the same professor hash differently on every sync run.
+            merged[k] = list(dict.fromkeys((val1 if isinstance(val1, list) else []) +
+                                           (val2 if isinstance(val2, list) else [])))
         else:
             merged[k] = val2 if (val2 and val2 != "N/A") else val1
     return merged
@@ -347,102 +349,190 @@ def validate_professor_details(prof, cs_courses):
     
     return prof
 
-def scrape_cs_professors():
+def extract_page(page):
+    """
+    Parse one fetched (url, html) page and extract its details and home page link.
+    Runs in the extraction process pool, so it returns plain data: (url, details, home_link),
+    with details None when the fetch failed.
+    """
+    url, html = page
+    if html is None:
+        return url, None, None
+    with instrumentation.timed("parse", url):
+        soup = parse_html(html, url)
+    with instrumentation.timed("extract", url):
+        return url, extract_details_from_page(soup), get_professor_homepage_link(soup)
+
+def iter_cs_professors(skip_links=(), skipped_subdomains=None):
     """
-    For each CS subdomain (from subtopic_links), extract professor profile links.
+    For each CS subdomain (from subtopic_links), extract professor profile links, then
+    visit each distinct professor once; a professor listed under several subdomains gets
+    a single record whose research_subdomain lists all of them (see SUBDOMAIN_SEPARATOR).
     For each professor profile page:
       - Extract raw details.
       - Look for a link to the professor's home page; if found, extract its details.
       - Merge details.
-    Returns a list of professor dictionaries.
+    Pages are fetched concurrently through the shared fetch engine, which applies
+    per-host rate limits in place of the old fixed sleeps, and parsed across cores in the
+    html_parsing extraction pool. Professor dictionaries are yielded as soon as their pages
+    are in, so downstream stages can start early.
+    Profiles in skip_links (already scraped by a resumed run) are not fetched; pass a dict
+    as skipped_subdomains to have it filled with {profile_link: [subdomains]} for them, so
+    the caller can bring the resumed records up to date with the current listings.
     """
-    all_professors = []
+    print("Fetching subdomain listing pages...")
+    listing_soups = get_soups(subtopic_links.values(), parse_only=LINKS_ONLY)
+
+    subdomains_by_link = {}
     for subdomain, sub_url in subtopic_links.items():
         print(f"Processing subdomain: {subdomain} at {sub_url}")
-        sub_soup = get_soup(sub_url)
+        sub_soup = listing_soups.get(sub_url)
         if not sub_soup:
             continue
         prof_links = extract_professor_profile_links(sub_soup)
         print(f"Found {len(prof_links)} professor profile links in subdomain '{subdomain}'.")
         for prof_link in prof_links:
-            print(f"Scraping professor profile: {prof_link}")
-            profile_soup = get_soup(prof_link)
-            if not profile_soup:
+            if prof_link not in skip_links:
+                target = subdomains_by_link
+            elif skipped_subdomains is not None:
+                target = skipped_subdomains
+            else:
+                continue
+            subdomains = target.setdefault(prof_link, [])
+            if subdomain not in subdomains:
+                subdomains.append(subdomain)
+    listings = sum(len(subdomains) for subdomains in subdomains_by_link.values())
+    print(f"{len(subdomains_by_link)} distinct professors across {listings} subdomain listings.")
+
+    def finish(prof_link, profile_details, home_details):
+        subdomain = SUBDOMAIN_SEPARATOR.join(subdomains_by_link[prof_link])
+        merged_details = merge_details(profile_details, home_details)
+        merged_details["profile_link"] = prof_link
+        merged_details["research_subdomain"] = subdomain
+        print(f"Finished processing: {merged_details.get('name', 'N/A')} in subdomain: {subdomain}\n")
+        yield merged_details
+
+    print(f"Fetching {len(subdomains_by_link)} professor profile pages...")
+    with extraction_pool() as pool:
+        pending_homes = {}
+        for prof_link, profile_details, home_link in map_pages(extract_page, iter_pages(subdomains_by_link), pool):
+            if profile_details is None:
                 continue
-            profile_details = extract_details_from_page(profile_soup)
             print(f"Scraped profile details for: {profile_details.get('name', 'N/A')}")
-            home_link = get_professor_homepage_link(profile_soup)
-            home_details = {}
             if home_link:
                 print(f"Found home page: {home_link}")
-                home_soup = get_soup(home_link)
-                if home_soup:
-                    home_details = extract_details_from_page(home_soup)
-                    print(f"Scraped home page details for: {home_details.get('name', 'N/A')}")
-            merged_details = merge_details(profile_details, home_details)
-            merged_details["profile_link"] = prof_link
-            merged_details["research_subdomain"] = subdomain
-            all_professors.append(merged_details)
-            print(f"Finished processing: {merged_details.get('name', 'N/A')} in subdomain: {subdomain}\n")
-            time.sleep(1)
-    return all_professors
+                pending_homes.setdefault(home_link, []).append((prof_link, profile_details))
+            else:
+                yield from finish(prof_link, profile_details, {})
+
+        print(f"Fetching {len(pending_homes)} professor home pages...")
+        for home_link, home_details, _ in map_pages(extract_page, iter_pages(pending_homes), pool):
+            if home_details:
+                print(f"Scraped home page details for: {home_details.get('name', 'N/A')}")
+            for prof_link, profile_details in pending_homes[home_link]:
+                yield from finish(prof_link, profile_details, home_details or {})
+
+def scrape_cs_professors():
+    """Scrape every CS professor (see iter_cs_professors). Returns a list of professor dictionaries."""
+    return list(iter_cs_professors())
+
+@instrumentation.instrumented("summarize")
+def summarize_professor(prof):
+    """
+    Summarize the research_description and academic_background fields of one professor
+    using the cached OpenAI summarization function.
+    """
+    raw_desc = prof.get("research_description", "")
+    if raw_desc and len(raw_desc.split()) >= 30:
+        prof["research_description"] = cached_summarize(raw_desc)
+        print(f"Summarized research description for {prof.get('name', 'N/A')}")
+    raw_bg = prof.get("academic_background", "")
+    if raw_bg and len(raw_bg.split()) >= 30:
+        prof["academic_background"] = cached_summarize(raw_bg)
+        print(f"Summarized academic background for {prof.get('name', 'N/A')}")
+    return prof
 
 def perform_summarization_on_professors(professors):
     """
     After scraping is complete, iterate over professor entries and summarize the research_description
     and academic_background fields using the cached OpenAI summarization function.
     """
-    for prof in professors:
-        raw_desc = prof.get("research_description", "")
-        if raw_desc and len(raw_desc.split()) >= 30:
-            prof["research_description"] = cached_summarize(raw_desc)
-            print(f"Summarized research description for {prof.get('name', 'N/A')}")
-        raw_bg = prof.get("academic_background", "")
-        if raw_bg and len(raw_bg.split()) >= 30:
-            prof["academic_background"] = cached_summarize(raw_bg)
-            print(f"Summarized academic background for {prof.get('name', 'N/A')}")
+    map_concurrently(summarize_professor, professors)
     return professors
 
-def save_to_csv(professors_data, filename='cs_professors_dataset.csv'):
-    # Create data directory if it doesn't exist
-    data_dir = os.path.join(os.path.dirname(__file__), 'data')
-    os.makedirs(data_dir, exist_ok=True)
-    
-    # Save to CSV
-    filepath = os.path.join(data_dir, filename)
-    with open(filepath, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=professors_data[0].keys())
-        writer.writeheader()
-        writer.writerows(professors_data)
-    
-    print(f"Saved {len(professors_data)} professors to {filepath}")
+def process_cs_professor(prof):
+    """Validate and summarize a single scraped professor (the per-record form of run_cs_pipeline)."""
+    prof = validate_professor_details(prof, cs_courses)
+    return summarize_professor(prof)
+
+def save_dataset(professors_data, name='cs_professors_dataset'):
+    """Save professor data as data/<name>.parquet (plus a CSV export)."""
+    return dataset_io.save_dataset(professors_data, name)
+
+def cs_checkpoint_key(prof):
+    """Checkpoint key for a CS record (one record per profile)."""
+    return prof.get('profile_link')
 
-def run_cs_pipeline():
+def merge_subdomains(research_subdomain, subdomains):
+    """research_subdomain with any of subdomains it does not list yet appended."""
+    merged = research_subdomain.split(SUBDOMAIN_SEPARATOR) if research_subdomain else []
+    for subdomain in subdomains:
+        if subdomain not in merged:
+            merged.append(subdomain)
+    return SUBDOMAIN_SEPARATOR.join(merged)
+
+def combine_subdomain_records(professors):
+    """
+    Fold records of the same profile into one whose research_subdomain lists every
+    subdomain, keeping the first record's details. Journals written before CS records
+    were deduplicated hold one record per profile and subdomain.
+    """
+    combined = {}
+    for prof in professors:
+        link = prof.get("profile_link")
+        if link not in combined:
+            combined[link] = dict(prof)
+            continue
+        combined[link]["research_subdomain"] = merge_subdomains(
+            combined[link]["research_subdomain"], prof["research_subdomain"].split(SUBDOMAIN_SEPARATOR))
+    return list(combined.values())
+
+def run_cs_pipeline(resume=False):
     """
     Full pipeline for scraping, validating, summarizing, and saving CS professor data.
+    Every professor is journaled as it finishes each stage; with resume=True, work
+    already recorded in the checkpoint journal is reused instead of redone.
     """
     print("Running full CS professor scraping pipeline...")
+    journal = CheckpointJournal("cs", resume=resume)
 
     print("Scraping CS professors...")
-    professors = scrape_cs_professors()
+    professors = combine_subdomain_records(journal.records("scraped"))
+    skip_links = {prof["profile_link"] for prof in professors}
+    skipped_subdomains = {}
+    for prof in iter_cs_professors(skip_links=skip_links, skipped_subdomains=skipped_subdomains):
+        professors.append(journal.append("scraped", cs_checkpoint_key(prof), prof))
     print(f"Finished web scraping. Total professors scraped: {len(professors)}")
 
-    print("Validating professor details...")
-    for i in range(len(professors)):
-        professors[i] = validate_professor_details(professors[i], cs_courses)
-        print(f"Validated: {professors[i].get('name', 'N/A')}")
-
-    print("Summarizing descriptions and backgrounds...")
-    professors = perform_summarization_on_professors(professors)
+    print("Validating and summarizing professor details...")
+    professors = journal.process("processed", professors, process_cs_professor, cs_checkpoint_key, map_fn=map_concurrently)
+    # Resumed professors keep the details journaled by the earlier run, but pick up any
+    # subdomain listing they have been added to since.
+    for prof in professors:
+        if prof["profile_link"] in skipped_subdomains:
+            prof["research_subdomain"] = merge_subdomains(prof.get("research_subdomain"),
+                                                          skipped_subdomains[prof["profile_link"]])
 
-    print("Saving CS professor data to CSV...")
-    save_to_csv(professors)
+    print("Saving CS professor dataset...")
+    save_dataset(professors)
     print("CS professor dataset saved successfully.")
+    print_llm_cache_stats()
+    print_token_stats()
 
     return professors
 
 
-def main():
+def main(resume=False):
     # Test the OpenAI endpoint before starting.
     print("Testing OpenAI endpoint with model '4o-mini'...")
     test_prompt = "Say hello."
@@ -452,22 +542,12 @@ def main():
     print("Using manually defined CS courses for validation...")
     print(f"CS Courses: {cs_courses}\n")
     
-    print("Starting comprehensive CS professor scraping (sequential)...")
-    professors = scrape_cs_professors()
-    print(f"Finished web scraping. Total professors scraped: {len(professors)}\n")
-    
-    print("Validating professor details against reference lists...")
-    for idx, prof in enumerate(professors):
-        professors[idx] = validate_professor_details(prof, cs_courses)
-        print(f"Validated details for: {prof.get('name', 'N/A')}")
-    print("Validation complete.\n")
-    
-    print("Starting summarization tasks for research description and academic background...")
-    professors = perform_summarization_on_professors(professors)
-    
-    # Save the data to CSV
-    save_to_csv(professors)
-    print("CS professors dataset saved as scripts/data/cs_professors_dataset.csv.")
+    run_cs_pipeline(resume=resume)
+    print("CS professors dataset saved as scripts/data/cs_professors_dataset.parquet (CSV export alongside).")
 
 if __name__ == "__main__":
-    main()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Scrape CS professor data")
+    parser.add_argument("--resume", action="store_true", help="Reuse work recorded in the checkpoint journal")
+    main(resume=parser.parse_args().resume)
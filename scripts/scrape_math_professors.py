@@ -1,13 +1,19 @@
-import requests
 from bs4 import BeautifulSoup
 import re
-import csv
-import time
-from functools import lru_cache
+import dataset_io
 from openai import OpenAI
 import os
 from typing import Optional
 from dotenv import load_dotenv
+from fetch_engine import get_soup, iter_soups
+from checkpoint import CheckpointJournal
+from llm_cache import cached_chat_completion, print_stats as print_llm_cache_stats
+from llm_executor import map_concurrently
+from text_cleaning import clean_text
+import instrumentation
+from token_budget import SUMMARY_INPUT_TOKENS, print_stats as print_token_stats, reduce_to_budget, truncate_to_budget
+from structured_extraction import FUSED_EXTRACTION, extract_summary_and_area
+from area_classifier import get_classifier, use_embeddings
 
 load_dotenv()
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
@@ -43,45 +49,34 @@ RESEARCH_TO_MAJORS_MATH = {
     "Category Theory": ["Mathematics", "Computer Science", "Logic"]
 }
 
-@lru_cache(maxsize=1000)
+MATH_SUMMARY_INSTRUCTIONS = "Your output will be featured on a website. You should talk about the professor in the third person and the summary should be describing the professor based on their research description provided. This is an example of a good description: Kiril Datchev is an Associate Professor in the Department of Mathematics at Purdue University, where he teaches courses in Linear Algebra and Functional Analysis. His research focuses on various aspects of mathematical physics, particularly in spectral theory and wave equations, with numerous publications co-authored with colleagues on topics such as low energy resolvent asymptotics, eigenvalue behavior, and semiclassical resonances. Datchev has supervised PhD students and has been involved in organizing academic conferences and programs related to microlocal analysis. His extensive publication record includes articles in prestigious journals, contributing significantly to the fields of analysis and partial differential equations. Summarize the following academic research text in 3-5 sentences. "
+
 def cached_summarize(text: str) -> str:
     if not text or len(text.split()) < 30:
         return text
+    # Over-budget text is summarized chunk by chunk and the partial summaries summarized below.
+    text = reduce_to_budget(text, cached_summarize)
     try:
-        response = client.chat.completions.create(
+        content = cached_chat_completion(
+            client,
             model="gpt-4.1-nano",
             messages=[
                 {"role": "system", "content": "You are a helpful assistant that creates concise, 3-5 sentence summaries of academic text."},
-                {"role": "user", "content": f"Your output will be featured on a website. You should talk about the professor in the third person and the summary should be describing the professor based on their research description provided. This is an example of a good description: Kiril Datchev is an Associate Professor in the Department of Mathematics at Purdue University, where he teaches courses in Linear Algebra and Functional Analysis. His research focuses on various aspects of mathematical physics, particularly in spectral theory and wave equations, with numerous publications co-authored with colleagues on topics such as low energy resolvent asymptotics, eigenvalue behavior, and semiclassical resonances. Datchev has supervised PhD students and has been involved in organizing academic conferences and programs related to microlocal analysis. His extensive publication record includes articles in prestigious journals, contributing significantly to the fields of analysis and partial differential equations. Summarize the following academic research text in 3-5 sentences. \n\n{text}"}
+                {"role": "user", "content": f"{MATH_SUMMARY_INSTRUCTIONS}\n\n{text}"}
             ],
             max_tokens=150,
             temperature=0.1,
         )
-        return clean_text(response.choices[0].message.content)
+        return clean_text(content)
     except Exception as e:
         print(f"Summarization error: {e}")
         return text
 
-def clean_text(text: str) -> str:
-    if not text:
-        return ""
-    text = "".join(ch for ch in text if ch.isprintable())
-    return re.sub(r"\s+", " ", text).strip()
-
-def get_soup(url: str) -> Optional[BeautifulSoup]:
-    try:
-        resp = requests.get(url, timeout=10)
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
-        soup.base_url = url
-        return soup
-    except Exception as e:
-        print(f"Error fetching {url}: {e}")
-        return None
-
+@instrumentation.instrumented("classify")
 def classify_research_area(text: str) -> str:
     if not text or len(text.split()) < 10:
         return "Not found"
+    text = truncate_to_budget(text, SUMMARY_INPUT_TOKENS)
     prompt = f"""
 Choose one research area from the following list using the text description provided:
 {', '.join(KNOWN_RESEARCH_AREAS_MATH)}.
@@ -92,7 +87,8 @@ Research Description Text:
 Only respond with one exact area from the list above.
 """
     try:
-        response = client.chat.completions.create(
+        content = cached_chat_completion(
+            client,
             model="gpt-4.1-nano",
             messages=[
                 {"role": "system", "content": "You are a research area classification assistant given a professor's research description."},
@@ -101,7 +97,7 @@ Only respond with one exact area from the list above.
             max_tokens=40,
             temperature=0.0,
         )
-        area = clean_text(response.choices[0].message.content.strip(' "\''))
+        area = clean_text(content.strip(' "\''))
         for known in KNOWN_RESEARCH_AREAS_MATH:
             if known.lower() in area.lower():
                 print(f"✅ Classified as: {known}")
@@ -123,114 +119,182 @@ def get_personal_website_link(block: BeautifulSoup, email) -> str:
 
 
 
-def scrape_math_professors():
+def extract_faculty_entry(block: BeautifulSoup) -> Optional[dict]:
+    info_div = block.select_one(".col-xs-12.col-sm-10.novcenter")
+    if not info_div:
+        print("⚠️ Missing info container.")
+        return None
+
+    name_tag = info_div.find("h2", class_="peopleDirectoryName")
+    name = clean_text(name_tag.get_text()) if name_tag else "N/A"
+
+    title_tag = info_div.find("strong")
+    title = clean_text(title_tag.get_text()) if title_tag else "N/A"
+
+    ul = info_div.find("ul")
+    office = clean_text(ul.get_text()) if ul else "N/A"
+
+    bg_div = info_div.find_all("div")
+    background = ""
+    for d in bg_div:
+        text = clean_text(d.get_text())
+        if "University" in text or re.search(r"\b\d{4}\b", text):
+            background = text
+            break
+
+    email_tag = info_div.find("a", href=re.compile(r"mailto:"))
+    email = clean_text(email_tag.get("href").replace("mailto:", "")) if email_tag else "N/A"
+
+    profile_url = get_personal_website_link(block, email)
+
+    return {"name": name, "title": title, "office": office, "background": background,
+            "email": email, "profile_url": profile_url}
+
+@instrumentation.instrumented("extract")
+def extract_profile_description(profile_soup: BeautifulSoup) -> str:
+    paragraphs = profile_soup.find_all("p")
+    relevant = [clean_text(p.get_text()) for p in paragraphs if any(x in p.get_text().lower() for x in ["research", "interest", "publication"])]
+    return " ".join(relevant[:3]) if relevant else clean_text(profile_soup.get_text())
+
+def iter_math_professors(skip_links=()):
+    """
+    Yield raw (unsummarized, unclassified) professor records as each personal page arrives.
+    Personal pages in skip_links are not fetched.
+    """
     base_url = "https://www.math.purdue.edu"
     faculty_url = f"{base_url}/people/faculty.html"
     soup = get_soup(faculty_url)
     if not soup:
-        return []
+        return
 
-    professors = []
     faculty_blocks = soup.select(".element.directory-row.faculty")
 
     print(f"\n🔎 Found {len(faculty_blocks)} faculty entries")
 
-    for idx, block in enumerate(faculty_blocks):
-        print("\n" + "="*60)
-        print(f"📘 Scraping professor {idx + 1}/{len(faculty_blocks)}")
-
-        info_div = block.select_one(".col-xs-12.col-sm-10.novcenter")
-        if not info_div:
-            print("⚠️ Missing info container.")
-            continue
-
-        name_tag = info_div.find("h2", class_="peopleDirectoryName")
-        name = clean_text(name_tag.get_text()) if name_tag else "N/A"
-
-        title_tag = info_div.find("strong")
-        title = clean_text(title_tag.get_text()) if title_tag else "N/A"
-
-        ul = info_div.find("ul")
-        office = clean_text(ul.get_text()) if ul else "N/A"
-
-        bg_div = info_div.find_all("div")
-        background = ""
-        for d in bg_div:
-            text = clean_text(d.get_text())
-            if "University" in text or re.search(r"\b\d{4}\b", text):
-                background = text
-                break
-
-        email_tag = info_div.find("a", href=re.compile(r"mailto:"))
-        email = clean_text(email_tag.get("href").replace("mailto:", "")) if email_tag else "N/A"
-
-        profile_url = get_personal_website_link(block, email)
-
-        print(f"🧑 {name}")
-        print(f"📨 {email}")
-        print(f"🔗 Profile: {profile_url}")
-
-        profile_desc, personal_desc = "", ""
-        if profile_url:
-            profile_soup = get_soup(profile_url)
-            if profile_soup:
-                paragraphs = profile_soup.find_all("p")
-                relevant = [clean_text(p.get_text()) for p in paragraphs if any(x in p.get_text().lower() for x in ["research", "interest", "publication"])]
-                profile_desc = " ".join(relevant[:3]) if relevant else clean_text(profile_soup.get_text())
-                if len(profile_desc.split()) > 30:
-                    profile_desc = cached_summarize(name + ": " + profile_desc)
-
-        final_desc = personal_desc or profile_desc
-
-        print(f"🧠 Research text length: {len(final_desc.split())} words")
-
-        # Classify
-        area = classify_research_area(final_desc)
-        majors = RESEARCH_TO_MAJORS_MATH.get(area, [])[:3]
-        print(f"🔬 Area: {area}")
-        print(f"🎓 Majors: {majors}")
-
-        professor_data = {
-            "name": name,
-            "title": title,
-            "department": "Mathematics",
-            "classes_teaching": office,
-            "email": email,
-            "academic_background": background,
-            "profile_link": profile_url,
-            "research_description": final_desc,
-            "research_areas": [area] if area != "Not found" else [],
-            "preferred_majors": majors,
-            "currently_looking_for": "Not specified",
-            "research_subdomain": area
-        }
-        professors.append(professor_data)
-        print(f"✅ Finished: {name}")
-        time.sleep(0.3)
+    entries_by_url = {}
+    for block in faculty_blocks:
+        entry = extract_faculty_entry(block)
+        if entry and entry["profile_url"] not in skip_links:
+            entries_by_url.setdefault(entry["profile_url"], []).append(entry)
+
+    # Fetch every personal page concurrently (rate limited per host).
+    print(f"🌐 Fetching {len(entries_by_url)} personal pages...")
+    for profile_url, profile_soup in iter_soups(entries_by_url):
+        profile_desc = extract_profile_description(profile_soup) if profile_soup else ""
+        for entry in entries_by_url[profile_url]:
+            yield {
+                "name": entry["name"],
+                "title": entry["title"],
+                "department": "Mathematics",
+                "classes_teaching": entry["office"],
+                "email": entry["email"],
+                "academic_background": entry["background"],
+                "profile_link": profile_url,
+                "research_description": profile_desc,
+                "research_areas": [],
+                "preferred_majors": [],
+                "currently_looking_for": "Not specified",
+                "research_subdomain": "Not found"
+            }
+
+@instrumentation.instrumented("summarize")
+def summarize_math_professor(prof: dict) -> dict:
+    """Summarize one raw record from iter_math_professors, leaving classification for later."""
+    name = prof["name"]
+    print(f"🧑 {name}")
+    print(f"📨 {prof['email']}")
+    print(f"🔗 Profile: {prof['profile_link']}")
+
+    final_desc = prof["research_description"]
+    if len(final_desc.split()) > 30:
+        final_desc = cached_summarize(name + ": " + final_desc)
+    print(f"🧠 Research text length: {len(final_desc.split())} words")
+    prof["research_description"] = final_desc
+    return prof
+
+def assign_math_area(prof: dict, area: str) -> dict:
+    """Record a professor's research area and the majors it maps to."""
+    majors = RESEARCH_TO_MAJORS_MATH.get(area, [])[:3]
+    print(f"🔬 Area: {area}")
+    print(f"🎓 Majors: {majors}")
+
+    prof.update({
+        "research_areas": [area] if area != "Not found" else [],
+        "preferred_majors": majors,
+        "research_subdomain": area
+    })
+    print(f"✅ Finished: {prof['name']}")
+    return prof
+
+def classify_math_professors_by_embedding(professors: list) -> list:
+    """Classify a batch of summarized professors by embedding similarity (LLM only for close calls)."""
+    descriptions = [prof["research_description"] for prof in professors]
+    areas = get_classifier(KNOWN_RESEARCH_AREAS_MATH).classify_many(descriptions, fallback=classify_research_area)
+    return [assign_math_area(prof, area) for prof, area in zip(professors, areas)]
+
+def process_math_professor(prof: dict) -> dict:
+    """Summarize and classify one raw record from iter_math_professors."""
+    if use_embeddings():
+        return classify_math_professors_by_embedding([summarize_math_professor(prof)])[0]
+
+    # One structured call for summary + area when fused extraction is on; two calls otherwise.
+    final_desc = prof["research_description"]
+    extracted = None
+    if FUSED_EXTRACTION and len(final_desc.split()) > 30:
+        extracted = extract_summary_and_area(client, prof["name"] + ": " + final_desc, KNOWN_RESEARCH_AREAS_MATH,
+                                             MATH_SUMMARY_INSTRUCTIONS, summarize_min_words=31)
+    if not extracted:
+        prof = summarize_math_professor(prof)
+        return assign_math_area(prof, classify_research_area(prof["research_description"]))
+
+    name = prof["name"]
+    print(f"🧑 {name}")
+    print(f"📨 {prof['email']}")
+    print(f"🔗 Profile: {prof['profile_link']}")
+    if extracted["summary"]:
+        prof["research_description"] = clean_text(extracted["summary"])
+    print(f"🧠 Research text length: {len(prof['research_description'].split())} words")
+    return assign_math_area(prof, extracted["research_area"])
+
+def math_checkpoint_key(prof: dict) -> str:
+    return f"{prof.get('profile_link')}|{prof.get('name')}"
+
+def scrape_math_professors(journal: Optional[CheckpointJournal] = None):
+    """Scrape, summarize and classify every math professor, journaling each stage when a journal is given."""
+    if journal is None and use_embeddings():
+        professors = classify_math_professors_by_embedding(map_concurrently(summarize_math_professor, iter_math_professors()))
+    elif journal is None:
+        professors = map_concurrently(process_math_professor, iter_math_professors())
+    else:
+        scraped = journal.records("scraped")
+        skip_links = {prof["profile_link"] for prof in scraped}
+        for prof in iter_math_professors(skip_links=skip_links):
+            scraped.append(journal.append("scraped", math_checkpoint_key(prof), prof))
+        if use_embeddings():
+            # Summaries are journaled per professor; the whole department is then classified in one batch.
+            summarized = journal.process("summarized", scraped, summarize_math_professor, math_checkpoint_key, map_fn=map_concurrently)
+            professors = classify_math_professors_by_embedding(summarized)
+        else:
+            professors = journal.process("processed", scraped, process_math_professor, math_checkpoint_key, map_fn=map_concurrently)
 
     print(f"\n✅ Scraped {len(professors)} Math professors.")
     return professors
 
-def save_to_csv(professors_data, filename='math_professors_dataset.csv'):
-    data_dir = os.path.join(os.path.dirname(__file__), 'data')
-    os.makedirs(data_dir, exist_ok=True)
-    filepath = os.path.join(data_dir, filename)
-
-    if not professors_data:
-        print("⚠️ No data to save.")
-        return
+def save_dataset(professors_data, name='math_professors_dataset'):
+    return dataset_io.save_dataset(professors_data, name)
 
-    with open(filepath, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=professors_data[0].keys())
-        writer.writeheader()
-        writer.writerows(professors_data)
-    print(f"💾 Saved {len(professors_data)} entries to {filepath}")
-
-def run_math_pipeline():
+def run_math_pipeline(resume=False):
     print("🚀 Running Math professor pipeline...")
-    professors = scrape_math_professors()
-    save_to_csv(professors)
+    journal = CheckpointJournal("math", resume=resume)
+    professors = scrape_math_professors(journal)
+    save_dataset(professors)
+    print_llm_cache_stats()
+    print_token_stats()
     return professors
 
 if __name__ == "__main__":
-    run_math_pipeline()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Scrape Math professor data")
+    parser.add_argument("--resume", action="store_true", help="Reuse work recorded in the checkpoint journal")
+    run_math_pipeline(resume=parser.parse_args().resume)
@@ -0,0 +1,249 @@
+import queue
+import threading
+import time
+
+from llm_executor import MAX_CONCURRENCY
+from scrape_cs_professors import iter_cs_professors, process_cs_professor
+from scrape_biology_professors import iter_biology_professors, process_biology_professor
+from scrape_math_professors import iter_math_professors, process_math_professor
+from supabase_upload import (
+    SYNC_KEYS, SYNC_SNAPSHOT_PATH, UPLOAD_CHUNK_SIZE, attach_embeddings, clear_snapshot, delete_in_chunks,
+    get_supabase_client, insert_in_chunks, load_snapshot, prepare_record, record_hash,
+    reset_professors_table, save_snapshot,
+)
+
+# Department name -> (generator of scraped professors, per-professor summarize/classify step).
+DEPARTMENTS = {
+    "cs": (iter_cs_professors, process_cs_professor),
+    "biology": (iter_biology_professors, process_biology_professor),
+    "math": (iter_math_professors, process_math_professor),
+}
+
+# Bounded queues keep memory flat: a fast stage blocks instead of buffering a whole department.
+QUEUE_SIZE = 32
+# Summarize/classify workers; their API calls share the llm_executor rate limits.
+PROCESS_WORKERS = MAX_CONCURRENCY
+EMBED_BATCH_SIZE = 64
+# Seconds a partial batch may wait before it is flushed downstream anyway.
+FLUSH_INTERVAL = 5.0
+
+_DONE = object()
+
+
+def _batches(in_queue, batch_size, flush_interval, finished=None):
+    """
+    Yield lists of items from in_queue, flushing when full or after flush_interval of quiet.
+    finished (a threading.Event) is set once _DONE has been taken off the queue.
+    """
+    batch = []
+    deadline = time.monotonic() + flush_interval
+    while True:
+        try:
+            item = in_queue.get(timeout=max(deadline - time.monotonic(), 0.01))
+        except queue.Empty:
+            item = None
+        if item is _DONE:
+            if finished:
+                finished.set()
+            break
+        if item is not None:
+            batch.append(item)
+        if batch and (len(batch) >= batch_size or time.monotonic() >= deadline):
+            yield batch
+            batch = []
+        if time.monotonic() >= deadline:
+            deadline = time.monotonic() + flush_interval
+    if batch:
+        yield batch
+
+
+def _scrape_stage(name, iter_fn, process_fn, out_queue, failures):
+    scraped = 0
+    try:
+        for prof in iter_fn():
+            out_queue.put((name, process_fn, prof))
+            scraped += 1
+    except Exception as e:
+        print(f"❌ {name} scraper failed: {e}")
+        failures.append(f"{name} scraper failed")
+        return
+    if not scraped:
+        # Most likely a failed listing fetch rather than a department with no professors.
+        print(f"❌ {name} scraper returned no professors")
+        failures.append(f"{name} scraper returned no professors")
+
+
+def _process_stage(in_queue, out_queue, failures):
+    while True:
+        item = in_queue.get()
+        if item is _DONE:
+            break
+        name, process_fn, prof = item
+        try:
+            out_queue.put(prepare_record(process_fn(prof)))
+        except Exception as e:
+            print(f"❌ Processing failed for {prof.get('name', 'N/A')} ({name}): {e}")
+            failures.append(f"processing {prof.get('name', 'N/A')} ({name}) failed")
+
+
+class _SyncFilter:
+    """Drops records that are unchanged since the last upload and tracks what was seen."""
+
+    def __init__(self, key, snapshot_path):
+        self.key = key
+        self.snapshot_path = snapshot_path
+        snapshot = load_snapshot(snapshot_path)
+        self.previous = snapshot.get("rows", {}) if snapshot.get("key") == key else {}
+        self.current = {}
+        self.rows = {}
+
+    def changed(self, records):
+        kept = []
+        for record in records:
+            identity = record.get(self.key)
+            if not identity or identity in self.current:
+                print(f"⚠️ Skipping {record.get('name')}: missing or duplicate {self.key}.")
+                continue
+            self.current[identity] = record_hash(record)
+            if self.previous.get(identity) == self.current[identity]:
+                self.rows[identity] = self.current[identity]
+            else:
+                kept.append(record)
+        return kept
+
+    def written(self, records, failed):
+        failed_ids = {r[self.key] for r in failed}
+        for record in records:
+            identity = record[self.key]
+            if identity not in failed_ids:
+                self.rows[identity] = self.current[identity]
+            elif identity in self.previous:
+                self.rows[identity] = self.previous[identity]
+
+    def finish(self, supabase, chunk_size, failures=()):
+        """
+        Delete professors that were not seen this run and save the snapshot. If any scraper
+        or processing step failed, unseen professors may just be missing from this run, so
+        nothing is deleted and they keep their previous snapshot entries.
+        """
+        removed = sorted(set(self.previous) - set(self.current))
+        if failures and removed:
+            print(f"⚠️ Not deleting {len(removed)} professors missing from this run: {len(failures)} "
+                  f"scrape/processing failure(s), starting with {failures[0]}.")
+            failed_delete = removed
+        else:
+            failed_delete = delete_in_chunks(supabase, self.key, removed, chunk_size=chunk_size)
+        for identity in failed_delete:
+            self.rows[identity] = self.previous[identity]
+        # Records dropped before upload (e.g. no embedding) keep their previous state.
+        for identity in self.current:
+            if identity not in self.rows and identity in self.previous:
+                self.rows[identity] = self.previous[identity]
+        save_snapshot({"key": self.key, "rows": self.rows}, self.snapshot_path)
+
+
+def _drain(in_queue):
+    """Discard items until _DONE so upstream stages blocked on a full queue can finish."""
+    while in_queue.get() is not _DONE:
+        pass
+
+
+def _embed_stage(in_queue, out_queue, sync_filter, errors):
+    finished = threading.Event()
+    try:
+        for batch in _batches(in_queue, EMBED_BATCH_SIZE, FLUSH_INTERVAL, finished):
+            if sync_filter:
+                batch = sync_filter.changed(batch)
+            embedded = attach_embeddings(batch) if batch else []
+            if embedded:
+                out_queue.put(embedded)
+    except Exception as e:
+        print(f"❌ Embedding stage failed: {e!r}")
+        errors.append(e)
+        if not finished.is_set():
+            _drain(in_queue)
+    finally:
+        # Always tell the uploader to stop, even after a failure, or the pipeline never finishes.
+        out_queue.put(_DONE)
+
+
+def _upload_stage(in_queue, supabase, chunk_size, sync_filter, stats, errors):
+    key = sync_filter.key if sync_filter else None
+    while True:
+        records = in_queue.get()
+        if records is _DONE:
+            break
+        try:
+            failed = insert_in_chunks(supabase, records, chunk_size=chunk_size, on_conflict=key)
+        except Exception as e:
+            print(f"❌ Upload stage failed: {e!r}")
+            errors.append(e)
+            _drain(in_queue)
+            break
+        if sync_filter:
+            sync_filter.written(records, failed)
+        if stats["first_row_at"] is None and len(failed) < len(records):
+            stats["first_row_at"] = time.monotonic()
+            print(f"⏱️ First professors reached the database after {stats['first_row_at'] - stats['started_at']:.1f}s")
+        stats["uploaded"] += len(records) - len(failed)
+        stats["failed"] += len(failed)
+
+
+def run_streaming_pipeline(departments=None, upload_mode="reset", sync_key=SYNC_KEYS[0],
+                           chunk_size=UPLOAD_CHUNK_SIZE, supabase=None, snapshot_path=SYNC_SNAPSHOT_PATH):
+    """
+    Run scrape -> summarize/classify -> embed -> upload as concurrent stages joined by
+    bounded queues, so each professor flows to the database as soon as it is ready.
+    upload_mode="reset" clears the table first; "sync" upserts changed rows and deletes
+    removed ones at the end (see supabase_upload.sync_to_supabase).
+    Returns a stats dict with counts and timings.
+    """
+    departments = departments or list(DEPARTMENTS)
+    supabase = supabase or get_supabase_client()
+    sync_filter = _SyncFilter(sync_key, snapshot_path) if upload_mode == "sync" else None
+    if not sync_filter:
+        # Rows from the last sync are about to be wiped; the next sync starts from scratch.
+        clear_snapshot(snapshot_path)
+        reset_professors_table(supabase)
+
+    stats = {"started_at": time.monotonic(), "first_row_at": None, "uploaded": 0, "failed": 0}
+    # Exceptions from the embed and upload stages, re-raised once every stage has shut down.
+    errors = []
+    # Scrape/processing failures; in sync mode they suppress deletes (see _SyncFilter.finish).
+    failures = []
+    scraped_q = queue.Queue(maxsize=QUEUE_SIZE)
+    processed_q = queue.Queue(maxsize=QUEUE_SIZE)
+    embedded_q = queue.Queue(maxsize=max(QUEUE_SIZE // EMBED_BATCH_SIZE, 2))
+
+    scrapers = [threading.Thread(target=_scrape_stage, args=(name, *DEPARTMENTS[name], scraped_q, failures),
+                                 name=f"scrape-{name}") for name in departments]
+    processors = [threading.Thread(target=_process_stage, args=(scraped_q, processed_q, failures),
+                                   name=f"process-{i}")
+                  for i in range(PROCESS_WORKERS)]
+    embedder = threading.Thread(target=_embed_stage, args=(processed_q, embedded_q, sync_filter, errors),
+                                name="embed")
+    uploader = threading.Thread(target=_upload_stage, args=(embedded_q, supabase, chunk_size, sync_filter, stats, errors),
+                                name="upload")
+    for thread in scrapers + processors + [embedder, uploader]:
+        thread.start()
+
+    # Shut stages down in order: each one drains its input before the next is told to stop.
+    for thread in scrapers:
+        thread.join()
+    for _ in processors:
+        scraped_q.put(_DONE)
+    for thread in processors:
+        thread.join()
+    processed_q.put(_DONE)
+    embedder.join()
+    uploader.join()
+    if errors:
+        raise errors[0]
+
+    if sync_filter:
+        sync_filter.finish(supabase, chunk_size, failures)
+
+    elapsed = time.monotonic() - stats["started_at"]
+    print(f"\nStreaming pipeline finished in {elapsed:.1f}s: "
+          f"{stats['uploaded']} professors uploaded, {stats['failed']} failed.")
+    return stats
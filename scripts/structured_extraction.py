@@ -0,0 +1,88 @@
+import json
+import os
+from typing import Optional
+
+import instrumentation
+from llm_cache import cached_chat_completion
+from token_budget import SUMMARY_INPUT_TOKENS, truncate_to_budget
+
+# Combined extraction: one JSON-structured call returns the summary and research area
+# (and optionally preferred majors) instead of separate summarize + classify calls.
+# Set LLM_FUSED_EXTRACTION=0 to fall back to the two-call flow.
+FUSED_EXTRACTION = os.getenv("LLM_FUSED_EXTRACTION", "1") != "0"
+
+EXTRACTION_MODEL = "gpt-4.1-nano"
+
+
+def match_known(value: str, known: list) -> Optional[str]:
+    """Map a model answer onto the known list: exact (case-insensitive) match first, then containment."""
+    value = (value or "").strip(' "\'').lower()
+    if not value:
+        return None
+    for item in known:
+        if item.lower() == value:
+            return item
+    for item in known:
+        if item.lower() in value:
+            return item
+    return None
+
+
+@instrumentation.instrumented("summarize_classify")
+def extract_summary_and_area(client, text: str, known_areas: list, summary_instructions: str,
+                             known_majors: list = None, summarize_min_words: int = 30,
+                             classify_min_words: int = 10) -> Optional[dict]:
+    """
+    Summarize text and pick one research area from known_areas (plus up to three majors
+    from known_majors, when given) in a single chat completion with a JSON response.
+
+    Returns {"summary", "research_area", "preferred_majors"} where summary is None if the
+    text is too short to summarize and research_area is "Not found" if it is too short to
+    classify or the answer is not in known_areas. Returns None if the call or the JSON
+    parse fails, so callers can fall back to the separate calls.
+    """
+    words = len(text.split()) if text else 0
+    result = {"summary": None, "research_area": "Not found", "preferred_majors": []}
+    if words < classify_min_words:
+        return result
+    text = truncate_to_budget(text, SUMMARY_INPUT_TOKENS)
+
+    majors_clause = ""
+    if known_majors:
+        majors_clause = (f"Choose up to three preferred student majors from this list: {', '.join(known_majors)}.\n")
+    prompt = (
+        f"{summary_instructions}\n\n"
+        f"Also choose exactly one research area from the following list: {', '.join(known_areas)}.\n"
+        f"{majors_clause}"
+        'Respond with a JSON object with the keys "summary" (string), "research_area" '
+        '(the exact name of one area from the list) and "preferred_majors" (list of strings).\n\n'
+        f"Text:\n{text}"
+    )
+    try:
+        content = cached_chat_completion(
+            client,
+            model=EXTRACTION_MODEL,
+            messages=[
+                {"role": "system", "content": "You are a helpful assistant that summarizes academic text and classifies it into research areas. You reply with JSON only."},
+                {"role": "user", "content": prompt},
+            ],
+            response_format={"type": "json_object"},
+            max_tokens=250,
+            temperature=0.1,
+        )
+        data = json.loads(content)
+    except Exception as e:
+        print(f"Structured extraction error: {e}")
+        return None
+    if not isinstance(data, dict):
+        # Valid JSON but not an object (a list, string or null); let the caller fall back.
+        print(f"Structured extraction error: expected a JSON object, got {type(data).__name__}")
+        return None
+
+    if words >= summarize_min_words and isinstance(data.get("summary"), str) and data["summary"].strip():
+        result["summary"] = data["summary"]
+    result["research_area"] = match_known(str(data.get("research_area", "")), known_areas) or "Not found"
+    if known_majors and isinstance(data.get("preferred_majors"), list):
+        majors = [match_known(str(m), known_majors) for m in data["preferred_majors"]]
+        result["preferred_majors"] = list(dict.fromkeys(m for m in majors if m))[:3]
+    return result
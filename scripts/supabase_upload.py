@@ -1,71 +1,260 @@
+import gc
 import os
 import time
+import json
+import hashlib
 import pandas as pd
-import openai
-import ast
-from supabase import create_client, Client
+import instrumentation
+from dataset_io import LIST_FIELDS, convert_list_column, convert_list_field, dataset_path, read_dataset
+from embeddings import EMBEDDING_MODEL, get_embeddings
+from quantization import EMBEDDING_PRECISION, PRECISIONS, format_for_upload
+from supabase import create_client
 from dotenv import load_dotenv
 
 load_dotenv()
-openai.api_key = os.getenv("OPENAI_API_KEY")
-if not openai.api_key:
-    raise ValueError("Please set the OPENAI_API_KEY environment variable in your .env file")
 
+# Rows per insert request and how many times a failed chunk is retried.
+UPLOAD_CHUNK_SIZE = 200
+UPLOAD_MAX_RETRIES = 3
 
-def get_embedding(text: str) -> list:
+# Sync mode: identity column used for upserts/deletes, and the snapshot of what was last uploaded.
+# The identity column needs a unique constraint in the professors table for upserts to work.
+SYNC_KEYS = ("profile_link", "email")
+SYNC_SNAPSHOT_PATH = os.path.join(os.path.dirname(__file__), 'data', 'professors_upload_snapshot.json')
+
+
+@instrumentation.instrumented("upload")
+def insert_in_chunks(supabase, records, table="professors", chunk_size=UPLOAD_CHUNK_SIZE,
+                     max_retries=UPLOAD_MAX_RETRIES, on_conflict=None):
     """
-    Generate an embedding for the given text using OpenAI's text-embedding-ada-002 model.
-    Returns a list of floats (the embedding vector) or an empty list if something goes wrong.
+    Insert records in chunks of chunk_size rows per request (upserting on the
+    on_conflict column when given). A chunk that errors or returns fewer rows than
+    it sent is retried on its own with backoff; the other chunks are unaffected.
+    Returns the records from chunks that still failed.
     """
-    if not isinstance(text, str):
-        return []
-    if not text.strip():
-        return []
-    try:
-        response = openai.embeddings.create(
-            input=[text],
-            model="text-embedding-ada-002"
-        )
-        return response.data[0].embedding
-    except Exception as e:
-        print("Error generating embedding:", e)
-        return []
+    failed = []
+    total_chunks = (len(records) + chunk_size - 1) // chunk_size
+    for number, start in enumerate(range(0, len(records), chunk_size), 1):
+        chunk = records[start:start + chunk_size]
+        for attempt in range(max_retries + 1):
+            try:
+                if on_conflict:
+                    response = supabase.table(table).upsert(chunk, on_conflict=on_conflict).execute()
+                else:
+                    response = supabase.table(table).insert(chunk).execute()
+                # Instead of checking for .error, we check that every row came back.
+                if response.data and len(response.data) == len(chunk):
+                    print(f"✅ Wrote chunk {number}/{total_chunks} ({len(chunk)} rows)")
+                    break
+                error = f"expected {len(chunk)} rows back, got {len(response.data or [])}"
+            except Exception as e:
+                error = e
+            print(f"❌ Chunk {number}/{total_chunks} failed (attempt {attempt + 1}/{max_retries + 1}): {error}")
+            if attempt < max_retries:
+                time.sleep(2 ** attempt)
+        else:
+            names = ", ".join(str(r.get("name")) for r in chunk[:5])
+            print(f"❌ Giving up on chunk {number}/{total_chunks} ({len(chunk)} rows, starting with {names})")
+            failed.extend(chunk)
+    instrumentation.count("rows_written", len(records) - len(failed))
+    instrumentation.count("rows_failed", len(failed))
+    return failed
+
+
+@instrumentation.instrumented("upload")
+def delete_in_chunks(supabase, key, values, table="professors", chunk_size=UPLOAD_CHUNK_SIZE):
+    """Delete rows whose key column is in values, chunk_size values per request. Returns values not deleted."""
+    failed = []
+    for start in range(0, len(values), chunk_size):
+        chunk = values[start:start + chunk_size]
+        try:
+            supabase.table(table).delete().in_(key, chunk).execute()
+            print(f"🗑️ Deleted {len(chunk)} removed professors")
+        except Exception as e:
+            print(f"❌ Delete failed for {len(chunk)} professors: {e}")
+            failed.extend(chunk)
+    return failed
+
 
+def prepare_record(record: dict) -> dict:
+    """Make one professor dict JSON-ready: list fields parsed, NaN replaced with None."""
+    # Convert list fields (CSV strings or Parquet arrays) to actual Python lists.
+    for key in LIST_FIELDS:
+        value = record.get(key, None)
+        record[key] = convert_list_field(value)
 
-def convert_list_field(value):
+    # Convert non-serializable values (e.g., NaN) to None.
+    for key, value in record.items():
+        if isinstance(value, float) and pd.isna(value):
+            record[key] = None
+
+    return record
+
+
+def prepare_records(df: pd.DataFrame) -> list:
     """
-    Convert a CSV string representation of an array field into a proper Python list.
-    If value is already a list, return it. If it's a string such as "[]" or a list literal,
-    try to convert it using ast.literal_eval. If conversion fails, return an empty list.
+    Turn DataFrame rows into JSON-ready dicts (the same ones prepare_record builds), a
+    column at a time: list fields parsed, NaN replaced with None. Rows with an empty
+    research_description are dropped up front since they can never be embedded.
     """
-    if isinstance(value, list):
-        return value
-    if isinstance(value, str):
-        trimmed = value.strip()
-        if trimmed == "" or trimmed == "[]" or trimmed.lower() == "nan":
-            return []
-        try:
-            # Safely evaluate the string (e.g., "['x', 'y']") into a list
-            evaluated = ast.literal_eval(trimmed)
-            if isinstance(evaluated, list):
-                return evaluated
+    if "research_description" in df:
+        descriptions = df["research_description"].astype(object).where(df["research_description"].notna(), "")
+        has_description = descriptions.astype(str).str.strip().astype(bool)
+        if not has_description.all():
+            print(f"⚠️ Skipping {int((~has_description).sum())} professors with no research description.")
+            df = df[has_description]
+
+    # Materializing a list and a dict per row sets off repeated cyclic GC passes that cost
+    # more than the conversion itself; none of these objects can form cycles, so pause it.
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        columns = {}
+        for key in df.columns:
+            if key in LIST_FIELDS:
+                columns[key] = convert_list_column(df[key])
             else:
-                return [evaluated]
-        except Exception as e:
-            print(f"Warning: Could not convert field value '{value}' to list: {e}")
-            return []
-    return []
+                # Convert non-serializable values (e.g., NaN) to None.
+                values = df[key].astype(object)
+                columns[key] = values.where(values.notna(), None).tolist()
+        for key in LIST_FIELDS:
+            columns.setdefault(key, [[] for _ in range(len(df))])
+
+        keys = list(columns)
+        return [dict(zip(keys, row)) for row in zip(*columns.values())]
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def attach_embeddings(records: list, precision: str = EMBEDDING_PRECISION) -> list:
+    """
+    Embed every research description in a handful of batched requests and attach the
+    vectors at the given precision (see quantization.format_for_upload). Records without
+    an embedding are skipped; returns the embedded records.
+    """
+    embeddings = get_embeddings([record.get("research_description") for record in records])
+    embedded = []
+    for record, embedding in zip(records, embeddings):
+        if not embedding or not isinstance(embedding, list):
+            print(f"⚠️ Skipping {record.get('name')} due to missing embedding.")
+            continue
+        record["embedding"] = format_for_upload(embedding, precision)
+        embedded.append(record)
+    return embedded
+
+
+def record_hash(record: dict, precision: str = EMBEDDING_PRECISION) -> str:
+    """Hash of a record's uploaded content (the embedding follows from the description, model and precision)."""
+    content = {k: v for k, v in record.items() if k != "embedding"}
+    # List fields are unordered sets of tags; sort them so their order cannot change the hash.
+    for key in LIST_FIELDS:
+        if isinstance(content.get(key), list):
+            content[key] = sorted(content[key], key=str)
+    # float32 hashes as before, so existing snapshots stay valid.
+    model = EMBEDDING_MODEL if precision == "float32" else f"{EMBEDDING_MODEL}/{precision}"
+    payload = json.dumps([model, content], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def load_snapshot(path: str = SYNC_SNAPSHOT_PATH) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def clear_snapshot(path: str = SYNC_SNAPSHOT_PATH):
+    """Forget the last upload, e.g. before a reset, so a later sync does not trust stale hashes."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def save_snapshot(snapshot: dict, path: str = SYNC_SNAPSHOT_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
 
 
-def upload_to_supabase(df: pd.DataFrame):
+def diff_records(records: list, snapshot: dict, key: str, precision: str = EMBEDDING_PRECISION):
+    """
+    Compare records with the last uploaded snapshot ({"key": ..., "rows": {identity: hash}}).
+    Returns (added, changed, removed_identities, current_hashes). Records without an
+    identity are dropped, and only the first record per identity is kept.
+    """
+    previous = snapshot.get("rows", {}) if snapshot.get("key") == key else {}
+    current = {}
+    added, changed = [], []
+    for record in records:
+        identity = record.get(key)
+        if not identity:
+            print(f"⚠️ Skipping {record.get('name')}: no {key} to sync on.")
+            continue
+        if identity in current:
+            print(f"⚠️ Skipping duplicate {key} {identity} ({record.get('name')}).")
+            continue
+        current[identity] = record_hash(record, precision)
+        if identity not in previous:
+            added.append(record)
+        elif previous[identity] != current[identity]:
+            changed.append(record)
+    removed = sorted(set(previous) - set(current))
+    return added, changed, removed, current
+
+
+def sync_to_supabase(supabase, records: list, key: str = SYNC_KEYS[0], chunk_size: int = UPLOAD_CHUNK_SIZE,
+                     snapshot_path: str = SYNC_SNAPSHOT_PATH, precision: str = EMBEDDING_PRECISION):
+    """
+    Incrementally sync records into the professors table: upsert only added or changed
+    professors and delete removed ones, keyed on the given identity column. The table
+    stays fully populated throughout, and the snapshot is updated only for rows that
+    were written successfully so failures are retried on the next run.
+    """
+    snapshot = load_snapshot(snapshot_path)
+    added, changed, removed, current = diff_records(records, snapshot, key, precision)
+    unchanged = len(current) - len(added) - len(changed)
+    print(f"Sync diff: {len(added)} added, {len(changed)} changed, {len(removed)} removed, {unchanged} unchanged.")
+
+    to_write = attach_embeddings(added + changed, precision)
+    written = {r[key] for r in to_write}
+    failed = insert_in_chunks(supabase, to_write, chunk_size=chunk_size, on_conflict=key)
+    failed_delete = delete_in_chunks(supabase, key, removed, chunk_size=chunk_size)
+
+    # Only remember what actually reached the database; anything else keeps its old hash (or stays
+    # absent) so it is picked up again on the next run.
+    previous = snapshot.get("rows", {}) if snapshot.get("key") == key else {}
+    written -= {r[key] for r in failed}
+    rows = {}
+    for identity, digest in current.items():
+        if identity in written:
+            rows[identity] = digest
+        elif identity in previous:
+            rows[identity] = previous[identity]
+    for identity in failed_delete:
+        rows[identity] = previous[identity]
+    save_snapshot({"key": key, "rows": rows}, snapshot_path)
+    print(f"Synced {len(to_write) - len(failed)}/{len(to_write)} professors; "
+          f"deleted {len(removed) - len(failed_delete)}/{len(removed)}.")
+    return failed
+
+
+def get_supabase_client():
+    """Create a Supabase client from the NEXT_PUBLIC_SUPABASE_URL / NEXT_PUBLIC_SUPABASE_ANON_KEY environment variables."""
     supabase_url = os.getenv("NEXT_PUBLIC_SUPABASE_URL")
     supabase_key = os.getenv("NEXT_PUBLIC_SUPABASE_ANON_KEY")
 
     if not supabase_url or not supabase_key:
         raise ValueError("Missing Supabase credentials")
 
-    supabase: Client = create_client(supabase_url, supabase_key)
+    return create_client(supabase_url, supabase_key)
 
+
+def reset_professors_table(supabase):
     # Clear the current professors database.
     print("Clearing the current professors database...")
     # We use a filter that always evaluates to True (assuming id > 0 for all records)
@@ -76,42 +265,46 @@ def upload_to_supabase(df: pd.DataFrame):
     else:
         print("Professors table cleared and IDs reset.")
 
-    list_fields = ["classes_teaching", "research_areas", "preferred_majors"]
 
-    for index, row in df.iterrows():
-        record = row.to_dict()
-        research_text = record.get("research_description", "")
-        try:
-            embedding = get_embedding(research_text)
-            if not embedding or not isinstance(embedding, list):
-                print(f"⚠️ Skipping {record.get('name')} due to missing embedding.")
-                continue
-            record["embedding"] = embedding
-        except Exception as e:
-            print(f"Embedding error for {record.get('name')}: {e}")
-            continue
+def upload_to_supabase(df: pd.DataFrame, chunk_size: int = UPLOAD_CHUNK_SIZE, supabase=None,
+                       mode: str = "reset", sync_key: str = SYNC_KEYS[0], precision: str = EMBEDDING_PRECISION,
+                       snapshot_path: str = SYNC_SNAPSHOT_PATH):
+    """
+    Embed and upload the professor DataFrame. Pass supabase to reuse an existing
+    client (or a local PostgREST stand-in); otherwise one is created from the
+    NEXT_PUBLIC_SUPABASE_URL / NEXT_PUBLIC_SUPABASE_ANON_KEY environment variables.
 
-        # Convert list fields from string to actual Python lists.
-        for key in list_fields:
-            value = record.get(key, None)
-            record[key] = convert_list_field(value)
+    mode="reset" wipes the table via reset_professors_table and reinserts everything, then
+    records the rows that were inserted as the new sync snapshot (keyed on sync_key);
+    mode="sync" upserts/deletes only what changed since the last upload (see sync_to_supabase).
+    precision picks how embeddings are sent: float32, float16 or int8 (see quantization).
+    """
+    if supabase is None:
+        supabase = get_supabase_client()
 
-        # Convert non-serializable values (e.g., NaN) to None.
-        for key, value in record.items():
-            if isinstance(value, float) and pd.isna(value):
-                record[key] = None
+    records = prepare_records(df)
+    if mode == "sync":
+        return sync_to_supabase(supabase, records, key=sync_key, chunk_size=chunk_size,
+                                snapshot_path=snapshot_path, precision=precision)
 
-        print(f"⬆️ Uploading {record.get('name')}...")
-        try:
-            response = supabase.table("professors").insert(record).execute()
-            # Instead of checking for .error, we check if data was returned.
-            if not response.data or (isinstance(response.data, list) and len(response.data) == 0):
-                print(f"❌ Insert failed for {record.get('name')}: {response}")
-            else:
-                print(f"✅ Inserted: {record.get('name')}")
-        except Exception as e:
-            print(f"❌ Upload error for {record.get('name')}: {e}")
-        time.sleep(0.3)
+    # The table is about to be emptied, so the old snapshot no longer describes it.
+    clear_snapshot(snapshot_path)
+    reset_professors_table(supabase)
+    hashes = {}
+    for record in records:
+        identity = record.get(sync_key)
+        if identity and identity not in hashes:
+            hashes[identity] = record_hash(record, precision)
+    records = attach_embeddings(records, precision)
+
+    print(f"⬆️ Uploading {len(records)} professors in chunks of {chunk_size}...")
+    failed = insert_in_chunks(supabase, records, chunk_size=chunk_size)
+    print(f"Uploaded {len(records) - len(failed)}/{len(records)} professors.")
+    # Snapshot only the rows that were inserted, so a later sync re-sends the failed ones.
+    for record in failed:
+        hashes.pop(record.get(sync_key), None)
+    save_snapshot({"key": sync_key, "rows": hashes}, snapshot_path)
+    return failed
 
 
 if __name__ == "__main__":
@@ -119,15 +312,42 @@ if __name__ == "__main__":
 
     parser = argparse.ArgumentParser(description="Upload professors dataset to Supabase")
     parser.add_argument(
+        "--input",
         "--csv",
+        dest="input",
         type=str,
-        default="data/professors_dataset.csv",
-        help="Path to the CSV file containing combined professor data"
+        default=dataset_path("professors_dataset"),
+        help="Path to the combined professor dataset (.parquet, or a .csv export)"
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=UPLOAD_CHUNK_SIZE,
+        help="Number of rows sent per insert request"
+    )
+    parser.add_argument(
+        "--mode",
+        choices=["reset", "sync"],
+        default="reset",
+        help="reset: wipe and reload the table; sync: upsert/delete only what changed since the last upload"
+    )
+    parser.add_argument(
+        "--sync-key",
+        choices=SYNC_KEYS,
+        default=SYNC_KEYS[0],
+        help="Identity column used to match professors in sync mode"
+    )
+    parser.add_argument(
+        "--precision",
+        choices=PRECISIONS,
+        default=EMBEDDING_PRECISION,
+        help="Embedding precision sent to the database (float16 fits a halfvec column; int8 is dequantized on upload)"
     )
     args = parser.parse_args()
 
-    if not os.path.exists(args.csv):
-        print(f"❌ File not found: {args.csv}")
+    if not os.path.exists(args.input):
+        print(f"❌ File not found: {args.input}")
     else:
-        df = pd.read_csv(args.csv)
-        upload_to_supabase(df)
+        df = read_dataset(args.input)
+        upload_to_supabase(df, chunk_size=args.chunk_size, mode=args.mode, sync_key=args.sync_key,
+                           precision=args.precision)
@@ -0,0 +1,65 @@
+import re
+import time
+
+import instrumentation
+
+# ----------------------------
+# Shared text cleaning for the scrapers
+# ----------------------------
+# Output matches the old per-scraper helpers character for character (so LLM and
+# embedding cache keys built from cleaned text stay valid), but each call is a
+# str.translate pass plus a split/join instead of a per-character generator and
+# uncompiled regexes.
+
+_PDF_ARTIFACT = re.compile(r'>>?endobj.*?obj<</D.*?>>', re.DOTALL)
+_ARTIFACT_MARKERS = ("endobj", "obj<</d")
+
+
+class _NonPrintableTable(dict):
+    """str.translate table that deletes non-printable characters, filled in lazily per code point."""
+
+    def __missing__(self, codepoint):
+        char = chr(codepoint)
+        self[codepoint] = value = char if char.isprintable() else None
+        return value
+
+
+_NON_PRINTABLE = _NonPrintableTable()
+
+
+def strip_nonprintable(text: str) -> str:
+    """Drop every non-printable character (including all whitespace other than ' ')."""
+    return text.translate(_NON_PRINTABLE)
+
+
+def remove_artifacts(text: str) -> str:
+    """
+    Remove unwanted PDF or binary artifacts from the text.
+    For example, remove strings that include "endobj" or "obj<</D".
+    Lines that still contain an artifact marker are dropped entirely.
+    """
+    if not any(marker in text.lower() for marker in _ARTIFACT_MARKERS):
+        return text
+    text = _PDF_ARTIFACT.sub('', text)
+    return "\n".join(line for line in text.splitlines()
+                     if not any(marker in line.lower() for marker in _ARTIFACT_MARKERS))
+
+
+def clean_text(text: str, artifacts: bool = False) -> str:
+    """Remove non-printable characters (and PDF artifacts if asked) and collapse whitespace."""
+    if not text:
+        return ""
+    start = time.perf_counter()
+    text = strip_nonprintable(text)
+    if artifacts:
+        # Non-printables (newlines included) are gone, so the text is a single line here.
+        text = remove_artifacts(text)
+    text = " ".join(text.split())
+    instrumentation.record("clean", time.perf_counter() - start)
+    return text
+
+
+def clean_list(lst, artifacts: bool = False) -> list:
+    """Clean each string in a list, dropping the ones that come out empty."""
+    cleaned = (clean_text(item, artifacts) for item in lst)
+    return [item for item in cleaned if item]
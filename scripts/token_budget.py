@@ -0,0 +1,104 @@
+import os
+import threading
+
+try:
+    import tiktoken
+except ImportError:  # optional; fall back to a ~4 characters per token estimate
+    tiktoken = None
+
+# Token budgets for text sent to the models. Inputs over budget are map-reduce summarized
+# (summaries) or trimmed (everything else), and the amount cut is tallied for the run.
+SUMMARY_INPUT_TOKENS = int(os.getenv("SUMMARY_INPUT_TOKENS", 3000))
+# Chunks of an over-budget text that get summarized; anything past them is dropped.
+SUMMARY_MAX_CHUNKS = int(os.getenv("SUMMARY_MAX_CHUNKS", 4))
+# text-embedding-ada-002 accepts 8191 tokens per input.
+EMBEDDING_INPUT_TOKENS = int(os.getenv("EMBEDDING_INPUT_TOKENS", 8000))
+
+ENCODING_NAME = "cl100k_base"
+CHARS_PER_TOKEN = 4
+
+_encoding = None
+_stats = {"inputs_trimmed": 0, "tokens_cut": 0, "inputs_chunked": 0}
+_stats_lock = threading.Lock()
+
+
+def _get_encoding():
+    global _encoding
+    if _encoding is None and tiktoken is not None:
+        _encoding = tiktoken.get_encoding(ENCODING_NAME)
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Token count with tiktoken when installed, otherwise a characters/4 estimate."""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def split_tokens(text: str, max_tokens: int) -> list:
+    """Split text into consecutive pieces of at most max_tokens tokens each."""
+    encoding = _get_encoding()
+    if encoding is not None:
+        tokens = encoding.encode(text, disallowed_special=())
+        return [encoding.decode(tokens[i:i + max_tokens]) for i in range(0, len(tokens), max_tokens)]
+    # Without a tokenizer, cut on whitespace so words are not split.
+    pieces, current, size = [], [], 0
+    limit = max_tokens * CHARS_PER_TOKEN
+    for word in text.split():
+        if current and size + len(word) + 1 > limit:
+            pieces.append(" ".join(current))
+            current, size = [], 0
+        current.append(word[:limit])
+        size += len(word) + 1
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+
+def _record(key: str, tokens_cut: int = 0):
+    with _stats_lock:
+        _stats[key] += 1
+        _stats["tokens_cut"] += tokens_cut
+
+
+def truncate_to_budget(text: str, max_tokens: int) -> str:
+    """Return text cut down to its first max_tokens tokens, recording how much was dropped."""
+    if not isinstance(text, str):
+        return text
+    total = count_tokens(text)
+    if total <= max_tokens:
+        return text
+    kept = split_tokens(text, max_tokens)[0]
+    _record("inputs_trimmed", total - count_tokens(kept))
+    return kept
+
+
+def reduce_to_budget(text: str, summarize_fn, max_tokens: int = SUMMARY_INPUT_TOKENS,
+                     max_chunks: int = SUMMARY_MAX_CHUNKS) -> str:
+    """
+    Return text unchanged when it fits in max_tokens. Otherwise summarize each max_tokens
+    chunk with summarize_fn (at most max_chunks; the rest is dropped) and return the joined
+    partial summaries, which the caller then summarizes as usual.
+    """
+    if not isinstance(text, str) or count_tokens(text) <= max_tokens:
+        return text
+    chunks = split_tokens(text, max_tokens)
+    dropped = sum(count_tokens(chunk) for chunk in chunks[max_chunks:])
+    _record("inputs_chunked", dropped)
+    return "\n\n".join(summarize_fn(chunk) for chunk in chunks[:max_chunks])
+
+
+def get_stats() -> dict:
+    with _stats_lock:
+        return dict(_stats)
+
+
+def print_stats():
+    stats = get_stats()
+    tokenizer = "tiktoken" if _get_encoding() is not None else "~4 chars/token estimate"
+    print(f"Token budget ({tokenizer}): {stats['inputs_chunked']} input(s) chunked, "
+          f"{stats['inputs_trimmed']} trimmed, {stats['tokens_cut']} token(s) cut.")
@@ -0,0 +1,222 @@
+import os
+import time
+
+import numpy as np
+
+import instrumentation
+from quantization import EMBEDDING_PRECISION, dequantize, quantize
+
+# ----------------------------
+# Local Vector Index
+# ----------------------------
+# An in-process stand-in for the match_professors / match_professors_advanced SQL functions
+# (`order by embedding <-> vector_query`), so retrieval can be measured and tuned without a
+# live database and recommendations can be served locally when it is slow.
+#   VectorIndex: exact L2 top-k over a contiguous float32 matrix, one matrix product per batch.
+#   IVFIndex:    approximate top-k; vectors are bucketed by k-means centroid and a query only
+#                scans the n_probe buckets nearest to it. More probes = better recall, slower.
+IVF_PROBES = int(os.getenv("VECTOR_INDEX_PROBES", "8"))
+KMEANS_ITERATIONS = 10
+# Train IVF centroids on at most this many points per list; more barely moves them.
+KMEANS_SAMPLE_PER_LIST = 64
+# Rows per block when scoring many vectors against many queries/centroids (bounds memory).
+SCORE_BLOCK_ROWS = 8192
+# Saved index vectors, stored at EMBEDDING_PRECISION (see save_vectors).
+VECTORS_PATH = os.path.join(os.path.dirname(__file__), 'data', 'professor_vectors.npz')
+
+
+def as_matrix(vectors) -> np.ndarray:
+    """Vectors (lists, arrays, or a 2-D array) as a C-contiguous float32 matrix."""
+    matrix = np.ascontiguousarray(np.asarray(vectors, dtype=np.float32))
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    return matrix
+
+
+def _squared_distances(queries: np.ndarray, vectors: np.ndarray, vector_norms: np.ndarray) -> np.ndarray:
+    """(n_queries, n_vectors) matrix of ||q - v||^2, as ||v||^2 - 2 q.v + ||q||^2 (one matrix product)."""
+    distances = queries @ vectors.T
+    distances *= -2
+    distances += vector_norms[None, :]
+    distances += np.einsum("ij,ij->i", queries, queries)[:, None]
+    return np.maximum(distances, 0, out=distances)
+
+
+def _top_k(distances: np.ndarray, k: int):
+    """Indices and distances of the k smallest entries in each row, nearest first."""
+    k = min(k, distances.shape[1])
+    if k == 0:
+        return np.empty((distances.shape[0], 0), dtype=np.int64), np.empty((distances.shape[0], 0), dtype=np.float32)
+    part = np.argpartition(distances, k - 1, axis=1)[:, :k]
+    part_distances = np.take_along_axis(distances, part, axis=1)
+    order = np.argsort(part_distances, axis=1, kind="stable")
+    return np.take_along_axis(part, order, axis=1), np.take_along_axis(part_distances, order, axis=1)
+
+
+class VectorIndex:
+    """Exact nearest-neighbour search by L2 distance (what pgvector's <-> computes)."""
+
+    def __init__(self, vectors):
+        self.vectors = as_matrix(vectors)
+        self.norms = np.einsum("ij,ij->i", self.vectors, self.vectors)
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def search(self, queries, k: int = 10):
+        """
+        Top-k rows for each query. Returns (indices, distances), both shaped
+        (n_queries, k) and ordered nearest first; distances are L2, not squared.
+        """
+        queries = as_matrix(queries)
+        with instrumentation.timed("search"):
+            indices, distances = _top_k(_squared_distances(queries, self.vectors, self.norms), k)
+        return indices, np.sqrt(distances)
+
+
+def kmeans(vectors: np.ndarray, n_clusters: int, iterations: int = KMEANS_ITERATIONS, seed: int = 0) -> np.ndarray:
+    """Lloyd's k-means on a sample of the vectors; returns the (n_clusters, dim) centroids."""
+    rng = np.random.default_rng(seed)
+    sample_size = min(len(vectors), n_clusters * KMEANS_SAMPLE_PER_LIST)
+    sample = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+    centroids = sample[rng.choice(len(sample), n_clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = assign_to_centroids(sample, centroids)
+        counts = np.bincount(assignment, minlength=n_clusters)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, sample)
+        empty = counts == 0
+        centroids[~empty] = sums[~empty] / counts[~empty, None]
+        # Re-seed empty clusters with random sample points so every list gets used.
+        if empty.any():
+            centroids[empty] = sample[rng.choice(len(sample), int(empty.sum()), replace=False)]
+    return centroids
+
+
+def assign_to_centroids(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Index of the nearest centroid for every vector, scored SCORE_BLOCK_ROWS vectors at a time."""
+    centroid_norms = np.einsum("ij,ij->i", centroids, centroids)
+    assignment = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), SCORE_BLOCK_ROWS):
+        block = vectors[start:start + SCORE_BLOCK_ROWS]
+        assignment[start:start + len(block)] = _squared_distances(block, centroids, centroid_norms).argmin(axis=1)
+    return assignment
+
+
+class IVFIndex:
+    """
+    Approximate nearest-neighbour search with an inverted file: k-means splits the vectors
+    into n_lists buckets (stored contiguously, bucket by bucket) and a query is scored
+    exactly against the vectors of its n_probe nearest buckets only. n_lists defaults to
+    about sqrt(len(vectors)); n_probe can be changed per search.
+    """
+
+    def __init__(self, vectors, n_lists: int = None, n_probe: int = IVF_PROBES, seed: int = 0):
+        vectors = as_matrix(vectors)
+        self.n_lists = max(1, min(n_lists or int(np.sqrt(len(vectors))), len(vectors)))
+        self.n_probe = n_probe
+        start = time.perf_counter()
+        self.centroids = kmeans(vectors, self.n_lists, seed=seed)
+        self.centroid_norms = np.einsum("ij,ij->i", self.centroids, self.centroids)
+        assignment = assign_to_centroids(vectors, self.centroids)
+        # Row ids sorted by bucket, so bucket b is self.vectors[offsets[b]:offsets[b + 1]].
+        self.ids = np.argsort(assignment, kind="stable")
+        self.vectors = np.ascontiguousarray(vectors[self.ids])
+        self.norms = np.einsum("ij,ij->i", self.vectors, self.vectors)
+        self.offsets = np.concatenate(([0], np.cumsum(np.bincount(assignment, minlength=self.n_lists))))
+        self.build_seconds = time.perf_counter() - start
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def search(self, queries, k: int = 10, n_probe: int = None):
+        """
+        Same contract as VectorIndex.search, but only rows in the probed buckets can be
+        returned; if they hold fewer than k rows the rest is padded with index -1.
+        """
+        queries = as_matrix(queries)
+        n_probe = min(n_probe or self.n_probe, self.n_lists)
+        indices = np.full((len(queries), k), -1, dtype=np.int64)
+        distances = np.full((len(queries), k), np.inf, dtype=np.float32)
+        with instrumentation.timed("search"):
+            probes = _top_k(_squared_distances(queries, self.centroids, self.centroid_norms), n_probe)[0]
+            for row, (query, buckets) in enumerate(zip(queries, probes)):
+                rows = np.concatenate([np.arange(self.offsets[b], self.offsets[b + 1]) for b in buckets])
+                found, found_distances = _top_k(
+                    _squared_distances(query[None, :], self.vectors[rows], self.norms[rows]), k)
+                indices[row, :found.shape[1]] = self.ids[rows[found[0]]]
+                distances[row, :found.shape[1]] = found_distances[0]
+        return indices, np.sqrt(distances)
+
+
+def match_professors(index, records: list, query, match_limit: int = 10, applied_emails=(), n_probe: int = None) -> list:
+    """
+    Local equivalent of the match_professors / match_professors_advanced RPCs: the
+    match_limit records nearest to one query vector, each with its "distance", skipping
+    professors whose email is in applied_emails. records[i] must belong to index row i.
+    """
+    applied = {email.lower() for email in applied_emails if email}
+    # Over-fetch so that filtering out applied professors still leaves match_limit rows;
+    # widen the search if several rows share an applied email.
+    k = min(len(records), match_limit + len(applied))
+    while True:
+        if isinstance(index, IVFIndex):
+            indices, distances = index.search(query, k, n_probe=n_probe)
+        else:
+            indices, distances = index.search(query, k)
+        matches = []
+        for i, distance in zip(indices[0], distances[0]):
+            if i < 0:
+                continue
+            record = records[i]
+            if (record.get("email") or "").lower() in applied:
+                continue
+            matches.append({**record, "distance": float(distance)})
+            if len(matches) == match_limit:
+                return matches
+        if k >= len(records):
+            return matches
+        k = min(len(records), max(1, k * 2))
+
+
+def save_vectors(matrix, ids, path: str = VECTORS_PATH, precision: str = EMBEDDING_PRECISION) -> str:
+    """
+    Save index vectors with one id per row (e.g. profile_link) at the given precision;
+    float16 halves the file and int8 quarters it. Returns the path written.
+    """
+    codes, scales = quantize(matrix, precision)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "wb") as f:
+        np.savez(f, codes=codes, scales=scales, ids=np.asarray(ids, dtype=str))
+    return path
+
+
+def load_vectors(path: str = VECTORS_PATH):
+    """Load save_vectors output as (ids, float32 matrix), ready for VectorIndex or IVFIndex."""
+    with np.load(path) as saved:
+        return saved["ids"].tolist(), np.ascontiguousarray(dequantize(saved["codes"], saved["scales"]))
+
+
+def load_professor_vectors(name: str = "professors_dataset"):
+    """
+    Load a saved professors dataset and its research_description embeddings, ready to
+    index. Uses the dataset's embedding column when it has one, otherwise the embedding
+    cache (calling the API only for descriptions not embedded yet). Returns
+    (records, matrix) for the professors that have an embedding.
+    """
+    from dataset_io import EMBEDDING_FIELD, load_dataset
+    from supabase_upload import prepare_records
+
+    df = load_dataset(name)
+    if df is None:
+        raise FileNotFoundError(f"No {name} dataset in the data folder; run combine_professors.py first.")
+    records = prepare_records(df)
+    if records and all(record.get(EMBEDDING_FIELD) is not None for record in records):
+        embeddings = [list(record.pop(EMBEDDING_FIELD)) for record in records]
+    else:
+        from embeddings import get_embeddings
+        embeddings = get_embeddings([record.get("research_description") for record in records])
+    kept = [(record, embedding) for record, embedding in zip(records, embeddings) if len(embedding)]
+    if not kept:
+        return [], np.empty((0, 0), dtype=np.float32)
+    return [record for record, _ in kept], as_matrix([embedding for _, embedding in kept])